@@ -2,6 +2,8 @@
 Financial Expert Agent - Provides fundamental analysis and company insights
 """
 
+from typing import Optional
+
 from utils.ollama_client import OllamaClient
 
 
@@ -22,24 +24,44 @@ Your role:
 Be thorough, use financial metrics correctly, and consider both quantitative and qualitative factors.
 Balance optimism with realistic assessment.
 """
+
+    CACHE_TTL = 24 * 60 * 60  # Seconds a cached answer for identical inputs stays valid
     
     def __init__(self):
-        self.client = OllamaClient()
+        self.client = OllamaClient(cache_ttl=self.CACHE_TTL)
         self.name = "Financial Expert"
     
-    def analyze(self, stock_data: str, stock_symbol: str) -> dict:
+    def analyze(self, stock_data: str, stock_symbol: str, response: Optional[str] = None) -> dict:
         """
         Perform fundamental analysis on the company
         
         Args:
             stock_data: Formatted stock data including fundamentals
             stock_symbol: Stock ticker symbol
+            response: Model output already produced for build_prompt() (e.g.
+                by a batched request); skips the Ollama call
             
         Returns:
             Dictionary with analysis results
         """
         
-        prompt = f"""
+        if response is None:
+            print(f"💼 {self.name} is analyzing company fundamentals...")
+            
+            response = self.client.generate(
+                prompt=self.build_prompt(stock_data, stock_symbol),
+                system_prompt=self.SYSTEM_PROMPT
+            )
+        
+        return {
+            "agent": self.name,
+            "analysis": response,
+            "raw_data": stock_data
+        }
+    
+    def build_prompt(self, stock_data: str, stock_symbol: str) -> str:
+        """Build the fundamental analysis prompt"""
+        return f"""
 Provide a fundamental analysis for {stock_symbol} based on the following data:
 
 {stock_data}
@@ -71,19 +93,6 @@ RISKS & CONCERNS:
 INVESTMENT THESIS:
 [Summarize the case for/against investing in this stock]
 """
-        
-        print(f"💼 {self.name} is analyzing company fundamentals...")
-        
-        response = self.client.generate(
-            prompt=prompt,
-            system_prompt=self.SYSTEM_PROMPT
-        )
-        
-        return {
-            "agent": self.name,
-            "analysis": response,
-            "raw_data": stock_data
-        }
 
 
 if __name__ == "__main__":
@@ -2,26 +2,48 @@
 Forecaster Agent - Time series forecasting with ARIMA and statistical models
 """
 
+import hashlib
+import os
+import pickle
+import tempfile
+import time
 import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta
-from typing import Dict, List, Tuple, Optional
+from typing import Callable, Dict, List, Tuple, Optional
+import logging
 import warnings
-warnings.filterwarnings('ignore')
 
 try:
     from statsmodels.tsa.arima.model import ARIMA
     from statsmodels.tsa.holtwinters import ExponentialSmoothing
+    from statsmodels.tools.sm_exceptions import ConvergenceWarning
     STATSMODELS_AVAILABLE = True
+    # Short noisy price series routinely hit the optimizer's iteration cap
+    warnings.filterwarnings('ignore', category=ConvergenceWarning, module='statsmodels')
 except ImportError:
     STATSMODELS_AVAILABLE = False
 
 try:
     from prophet import Prophet
     PROPHET_AVAILABLE = True
+    warnings.filterwarnings('ignore', category=FutureWarning, module='prophet')
+    # cmdstanpy logs every optimizer start/finish at INFO
+    logging.getLogger('cmdstanpy').setLevel(logging.WARNING)
 except ImportError:
     PROPHET_AVAILABLE = False
 
+from config import FORECAST_CACHE_DIR, FORECAST_CACHE_TTL
+
+# Fit settings per model, hashed into the forecast cache key. Update a
+# model's entry whenever its fit settings change so fits cached under the
+# old settings are not served.
+_MODEL_CONFIGS = {
+    "arima": "order=(5,1,0)",
+    "ews": "trend=add,damped_trend",
+    "prophet": "weekly,yearly>=730d,changepoint_prior_scale=0.05",
+}
+
 
 class ForecasterAgent:
     """
@@ -29,16 +51,63 @@ class ForecasterAgent:
     Uses ARIMA, Exponential Smoothing, and optionally Prophet for predictions.
     """
 
-    def __init__(self):
+    def __init__(self, cache_dir: str = FORECAST_CACHE_DIR):
         self.name = "Forecaster"
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _cached_fit(self, model_name: str, fit: Callable[[], Dict],
+                    prices: List[float], dates: List[str], forecast_days: int) -> Dict:
+        """
+        Return a model's forecast from the disk cache, calling fit() only on a miss.
+
+        The key covers the exact price series, its date span, the horizon and
+        the model's fit settings, so any new data point or setting change
+        produces a fresh fit. Entries expire after
+        FORECAST_CACHE_TTL seconds.
+        """
+        digest = hashlib.sha256(np.asarray(prices, dtype=np.float64).tobytes())
+        digest.update(f"{model_name}|{_MODEL_CONFIGS[model_name]}|{dates[0]}|{dates[-1]}|{forecast_days}".encode())
+        path = os.path.join(self.cache_dir, f"{model_name}_{digest.hexdigest()[:32]}.pkl")
+
+        try:
+            if time.time() - os.path.getmtime(path) < FORECAST_CACHE_TTL:
+                with open(path, 'rb') as f:
+                    return pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            pass
+
+        result = fit()
+        if "error" not in result:
+            with tempfile.NamedTemporaryFile('wb', dir=self.cache_dir, suffix='.tmp', delete=False) as f:
+                pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(f.name, path)
+            self._prune_cache()
+        return result
+
+    def _prune_cache(self):
+        """Delete cached forecasts older than FORECAST_CACHE_TTL"""
+        cutoff = time.time() - FORECAST_CACHE_TTL
+        try:
+            entries = list(os.scandir(self.cache_dir))
+        except OSError:
+            return
+        for entry in entries:
+            try:
+                if entry.name.endswith('.pkl') and entry.stat().st_mtime < cutoff:
+                    os.remove(entry.path)
+            except OSError:
+                pass
 
     def prepare_data(self, prices: List[float], dates: List[str]) -> pd.DataFrame:
         """Prepare data for modeling"""
         df = pd.DataFrame({
             'ds': pd.to_datetime(dates),
-            'y': prices
+            'y': np.asarray(prices, dtype=np.float64)
         })
-        df = df.sort_values('ds').reset_index(drop=True)
+        # Fetched history is already chronological; only sort when it isn't
+        if not df['ds'].is_monotonic_increasing:
+            df = df.sort_values('ds').reset_index(drop=True)
         return df
 
     def fit_arima(self, prices: List[float], forecast_days: int = 10) -> Dict:
@@ -152,11 +221,14 @@ class ForecasterAgent:
         try:
             df = self.prepare_data(prices, dates)
 
+            # The yearly Fourier terms need at least two full cycles of history
+            span_days = (df['ds'].iloc[-1] - df['ds'].iloc[0]).days
+
             # Initialize and fit Prophet
             model = Prophet(
                 daily_seasonality=False,
                 weekly_seasonality=True,
-                yearly_seasonality=True,
+                yearly_seasonality=span_days >= 2 * 365,
                 changepoint_prior_scale=0.05
             )
             model.fit(df)
@@ -165,25 +237,28 @@ class ForecasterAgent:
             future = model.make_future_dataframe(periods=forecast_days)
             forecast = model.predict(future)
 
-            # Get only the forecast period
-            forecast_only = forecast.tail(forecast_days)
+            # Get only the forecast period, as plain arrays
+            yhat = forecast['yhat'].to_numpy()[-forecast_days:]
+            lower = forecast['yhat_lower'].to_numpy()[-forecast_days:]
+            upper = forecast['yhat_upper'].to_numpy()[-forecast_days:]
+            ds = forecast['ds'].to_numpy()[-forecast_days:]
 
             return {
                 "model": "Prophet",
-                "forecast_values": forecast_only['yhat'].tolist(),
-                "lower_bound": forecast_only['yhat_lower'].tolist(),
-                "upper_bound": forecast_only['yhat_upper'].tolist(),
+                "forecast_values": yhat.tolist(),
+                "lower_bound": lower.tolist(),
+                "upper_bound": upper.tolist(),
                 "next_day": {
-                    "prediction": float(forecast_only['yhat'].iloc[0]),
-                    "lower": float(forecast_only['yhat_lower'].iloc[0]),
-                    "upper": float(forecast_only['yhat_upper'].iloc[0])
+                    "prediction": float(yhat[0]),
+                    "lower": float(lower[0]),
+                    "upper": float(upper[0])
                 },
                 "day_10": {
-                    "prediction": float(forecast_only['yhat'].iloc[-1]),
-                    "lower": float(forecast_only['yhat_lower'].iloc[-1]),
-                    "upper": float(forecast_only['yhat_upper'].iloc[-1])
+                    "prediction": float(yhat[-1]),
+                    "lower": float(lower[-1]),
+                    "upper": float(upper[-1])
                 },
-                "forecast_dates": forecast_only['ds'].dt.strftime('%Y-%m-%d').tolist()
+                "forecast_dates": np.datetime_as_string(ds, unit='D').tolist()
             }
         except Exception as e:
             return {"error": f"Prophet fitting failed: {str(e)}"}
@@ -261,9 +336,12 @@ class ForecasterAgent:
         current_price = prices[-1]
 
         # Fit individual models
-        arima_result = self.fit_arima(prices, forecast_days)
-        ews_result = self.fit_exponential_smoothing(prices, forecast_days)
-        prophet_result = self.fit_prophet(prices, dates, forecast_days) if PROPHET_AVAILABLE else {"error": "Prophet not available"}
+        arima_result = self._cached_fit("arima", lambda: self.fit_arima(prices, forecast_days),
+                                        prices, dates, forecast_days)
+        ews_result = self._cached_fit("ews", lambda: self.fit_exponential_smoothing(prices, forecast_days),
+                                      prices, dates, forecast_days)
+        prophet_result = self._cached_fit("prophet", lambda: self.fit_prophet(prices, dates, forecast_days),
+                                          prices, dates, forecast_days) if PROPHET_AVAILABLE else {"error": "Prophet not available"}
 
         # Generate ensemble forecast
         ensemble_result = self.generate_ensemble_forecast(arima_result, ews_result, prophet_result)
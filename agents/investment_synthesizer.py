@@ -23,9 +23,11 @@ Your role:
 Be decisive but honest about uncertainty. Consider both risk and opportunity.
 Remember: This is for educational purposes - always include appropriate disclaimers.
 """
+
+    CACHE_TTL = 60 * 60  # Seconds a cached answer for identical inputs stays valid
     
     def __init__(self):
-        self.client = OllamaClient()
+        self.client = OllamaClient(cache_ttl=self.CACHE_TTL)
         self.name = "Investment Synthesizer"
     
     def synthesize(self, 
@@ -2,6 +2,8 @@
 News Analyst Agent - Analyzes recent news about the stock
 """
 
+from typing import Optional
+
 from utils.ollama_client import OllamaClient
 
 
@@ -22,24 +24,44 @@ Your role:
 Be concise, factual, and focus on actionable insights.
 Avoid speculation - stick to what the news actually says.
 """
+
+    CACHE_TTL = 60 * 60  # Seconds a cached answer for identical inputs stays valid
     
     def __init__(self):
-        self.client = OllamaClient()
+        self.client = OllamaClient(cache_ttl=self.CACHE_TTL)
         self.name = "News Analyst"
     
-    def analyze(self, news_data: str, stock_symbol: str) -> dict:
+    def analyze(self, news_data: str, stock_symbol: str, response: Optional[str] = None) -> dict:
         """
         Analyze news data and return insights
         
         Args:
             news_data: Formatted news articles as string
             stock_symbol: Stock ticker symbol
+            response: Model output already produced for build_prompt() (e.g.
+                by a batched request); skips the Ollama call
             
         Returns:
             Dictionary with analysis results
         """
         
-        prompt = f"""
+        if response is None:
+            print(f"🗞️  {self.name} is analyzing news...")
+            
+            response = self.client.generate(
+                prompt=self.build_prompt(news_data, stock_symbol),
+                system_prompt=self.SYSTEM_PROMPT
+            )
+        
+        return {
+            "agent": self.name,
+            "analysis": response,
+            "raw_data": news_data
+        }
+    
+    def build_prompt(self, news_data: str, stock_symbol: str) -> str:
+        """Build the analysis prompt for the given news"""
+        return f"""
 Analyze the following recent news about {stock_symbol}:
 
 {news_data}
@@ -63,19 +85,6 @@ IMPACT ASSESSMENT:
 SUMMARY:
 [2-3 sentence summary of the overall news landscape]
 """
-        
-        print(f"🗞️  {self.name} is analyzing news...")
-        
-        response = self.client.generate(
-            prompt=prompt,
-            system_prompt=self.SYSTEM_PROMPT
-        )
-        
-        return {
-            "agent": self.name,
-            "analysis": response,
-            "raw_data": news_data
-        }
 
 
 if __name__ == "__main__":
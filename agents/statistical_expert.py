@@ -4,7 +4,7 @@ Statistical Expert Agent - Performs time series analysis and predictions
 
 from utils.ollama_client import OllamaClient
 import numpy as np
-from typing import Dict, List
+from typing import Dict, List, Optional
 
 
 class StatisticalExpertAgent:
@@ -25,14 +25,18 @@ Your role:
 Be precise, use statistical terminology correctly, and always acknowledge uncertainty.
 Focus on what the data shows, not speculation.
 """
+
+    CACHE_TTL = 6 * 60 * 60  # Seconds a cached answer for identical inputs stays valid
     
     def __init__(self):
-        self.client = OllamaClient()
+        self.client = OllamaClient(cache_ttl=self.CACHE_TTL)
         self.name = "Statistical Expert"
     
     def calculate_statistics(self, prices: List[float]) -> Dict:
         """Calculate basic statistical metrics"""
-        prices_array = np.array(prices)
+        # One contiguous float64 array for every metric below; no copy when
+        # the caller already passes one
+        prices_array = np.asarray(prices, dtype=np.float64)
         
         # Calculate returns
         returns = np.diff(prices_array) / prices_array[:-1] * 100
@@ -46,8 +50,11 @@ Focus on what the data shows, not speculation.
         
         # Trend (simple linear regression slope)
         if len(prices_array) > 1:
-            x = np.arange(len(prices_array))
-            slope = np.polyfit(x, prices_array, 1)[0]
+            # Closed-form least-squares slope; same result as np.polyfit(x, y, 1)[0]
+            n = len(prices_array)
+            x = np.arange(n)
+            sx = x.sum()
+            slope = (n * (x @ prices_array) - sx * prices_array.sum()) / (n * (x @ x) - sx * sx)
             trend = "Upward" if slope > 0 else "Downward" if slope < 0 else "Flat"
         else:
             slope = 0
@@ -66,7 +73,8 @@ Focus on what the data shows, not speculation.
             "price_range": (np.min(prices_array), np.max(prices_array))
         }
     
-    def analyze(self, price_data: str, prices: List[float], stock_symbol: str) -> dict:
+    def analyze(self, price_data: str, prices: List[float], stock_symbol: str,
+                response: Optional[str] = None) -> dict:
         """
         Perform statistical analysis on price data
         
@@ -74,6 +82,8 @@ Focus on what the data shows, not speculation.
             price_data: Formatted price data as string
             prices: List of historical prices
             stock_symbol: Stock ticker symbol
+            response: Model output already produced for build_prompt() (e.g.
+                by a batched request); skips the Ollama call
             
         Returns:
             Dictionary with analysis results
@@ -82,6 +92,27 @@ Focus on what the data shows, not speculation.
         # First, calculate statistics
         stats = self.calculate_statistics(prices)
         
+        if response is None:
+            print(f"📈 {self.name} is analyzing price data...")
+            
+            response = self.client.generate(
+                prompt=self._format_prompt(price_data, stats, stock_symbol),
+                system_prompt=self.SYSTEM_PROMPT
+            )
+        
+        return {
+            "agent": self.name,
+            "analysis": response,
+            "statistics": stats,
+            "raw_data": price_data
+        }
+    
+    def build_prompt(self, price_data: str, prices: List[float], stock_symbol: str) -> str:
+        """Build the analysis prompt for the given price history"""
+        return self._format_prompt(price_data, self.calculate_statistics(prices), stock_symbol)
+    
+    def _format_prompt(self, price_data: str, stats: Dict, stock_symbol: str) -> str:
+        """Fill the analysis prompt from precomputed statistics"""
         stats_summary = f"""
 STATISTICAL METRICS:
 - Current Price: ${stats['current_price']:.2f}
@@ -95,7 +126,7 @@ STATISTICAL METRICS:
 - Price Range: ${stats['price_range'][0]:.2f} - ${stats['price_range'][1]:.2f}
 """
         
-        prompt = f"""
+        return f"""
 Analyze the following statistical data for {stock_symbol}:
 
 {stats_summary}
@@ -124,20 +155,6 @@ STATISTICAL INSIGHTS:
 RISK ASSESSMENT:
 [Comment on the risk based on volatility and trends]
 """
-        
-        print(f"📈 {self.name} is analyzing price data...")
-        
-        response = self.client.generate(
-            prompt=prompt,
-            system_prompt=self.SYSTEM_PROMPT
-        )
-        
-        return {
-            "agent": self.name,
-            "analysis": response,
-            "statistics": stats,
-            "raw_data": price_data
-        }
 
 
 if __name__ == "__main__":
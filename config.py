@@ -2,9 +2,15 @@
 Configuration file for Stock Investment Planner
 """
 
+import os
+
 # Ollama Configuration
 OLLAMA_MODEL = "deepseek-r1:8b"  # Change to "llama3.1:8b" if preferred
 OLLAMA_BASE_URL = "http://localhost:11434"
+# Concurrent requests the Ollama server will serve (match the server's own setting)
+OLLAMA_NUM_PARALLEL = int(os.getenv("OLLAMA_NUM_PARALLEL", "4"))
+# How long the model (and its prompt cache) stays loaded between requests
+OLLAMA_KEEP_ALIVE = "30m"
 
 # Stock Configuration
 STOCKS = ["GOOGL", "MSFT", "AAPL", "AMZN", "NVDA", "META", "TSLA", "PLTR"]
@@ -40,6 +46,12 @@ TEMPERATURE = 0.7  # Creativity level (0.0-1.0)
 
 # Output Settings
 OUTPUT_DIR = "reports"
+LLM_CACHE_PATH = ".cache/llm_cache.sqlite"  # Cached agent responses
+FORECAST_CACHE_DIR = ".cache/forecasts"  # Cached model forecasts per price series
+MARKET_DATA_CACHE_DIR = ".cache/market_data"  # Cached price downloads and news feeds
+PRICE_CACHE_TTL = 60 * 60  # Seconds a downloaded price history stays fresh
+NEWS_CACHE_TTL = 30 * 60  # Seconds a fetched news feed stays fresh
+FORECAST_CACHE_TTL = 24 * 60 * 60  # Seconds a cached model forecast is kept
 GITHUB_REPO_DIR = "stock-reports-github"  # Your GitHub Pages repo directory
 
 # Schedule Settings (for automation)
@@ -10,390 +10,154 @@ import sys
 if sys.platform == "win32":
     sys.stdout.reconfigure(encoding='utf-8')
 
+import functools
+import itertools
 import json
 import os
 import re
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from glob import glob
-from typing import Dict, Any, List, Tuple
-
-
-class HTMLReportGenerator:
-    """Generates HTML reports from analysis results with modern styling"""
-
-    # Modern color palette
-    COLORS = {
-        'primary': '#6366f1',      # Indigo
-        'primary_dark': '#4f46e5',
-        'success': '#10b981',       # Emerald
-        'warning': '#f59e0b',       # Amber
-        'danger': '#ef4444',        # Red
-        'dark': '#0f172a',          # Slate 900
-        'dark_card': '#1e293b',     # Slate 800
-        'dark_border': '#334155',   # Slate 700
-        'light': '#f8fafc',         # Slate 50
-        'light_card': '#ffffff',
-        'text_dark': '#1e293b',
-        'text_light': '#f1f5f9',
-        'text_muted': '#64748b',
-    }
-
-    def __init__(self):
-        self.output_dir = "reports"  # Where JSON analysis files are saved
-        self.web_dir = "docs"  # GitHub Pages serves from /docs
-
-    def markdown_to_html(self, text: str) -> str:
-        """Convert markdown formatting to HTML"""
-        if not text:
-            return ""
-
-        # Convert markdown headers (#### Header) before other processing
-        text = re.sub(r'^#{1,6}\s+(.+)$', r'**\1**', text, flags=re.MULTILINE)
-
-        # Convert **bold** to <strong>
-        text = re.sub(r'\*\*([^*]+)\*\*', r'<strong>\1</strong>', text)
-
-        # Convert *italic* to <em> (but not bullet points)
-        text = re.sub(r'(?<!\n)\*([^*\n]+)\*', r'<em>\1</em>', text)
-
-        # Convert numbered lists (1. item)
-        lines = text.split('\n')
-        result_lines = []
-        in_ol = False
-        in_ul = False
-
-        for line in lines:
-            stripped = line.strip()
-
-            # Check for numbered list item
-            ol_match = re.match(r'^(\d+)\.\s+(.+)$', stripped)
-            # Check for bullet list item
-            ul_match = re.match(r'^[-*]\s+(.+)$', stripped)
-
-            if ol_match:
-                if not in_ol:
-                    if in_ul:
-                        result_lines.append('</ul>')
-                        in_ul = False
-                    result_lines.append('<ol>')
-                    in_ol = True
-                result_lines.append(f'<li>{ol_match.group(2)}</li>')
-            elif ul_match:
-                if not in_ul:
-                    if in_ol:
-                        result_lines.append('</ol>')
-                        in_ol = False
-                    result_lines.append('<ul>')
-                    in_ul = True
-                result_lines.append(f'<li>{ul_match.group(1)}</li>')
-            else:
-                if in_ol:
-                    result_lines.append('</ol>')
-                    in_ol = False
-                if in_ul:
-                    result_lines.append('</ul>')
-                    in_ul = False
-                # Convert section headers (ALL CAPS followed by colon)
-                if re.match(r'^[A-Z][A-Z\s&]+:$', stripped):
-                    result_lines.append(f'<h4>{stripped}</h4>')
-                elif stripped:
-                    result_lines.append(f'<p>{stripped}</p>')
-                else:
-                    result_lines.append('')
-
-        # Close any open lists
-        if in_ol:
-            result_lines.append('</ol>')
-        if in_ul:
-            result_lines.append('</ul>')
-
-        return '\n'.join(result_lines)
-
-    def _clean_text(self, text: str) -> str:
-        """Remove markdown formatting from text"""
-        # Remove ** bold markers
-        text = re.sub(r'\*\*', '', text)
-        # Remove list markers at start of text
-        text = re.sub(r'^\s*[\*\-]\s+', '', text)
-        text = re.sub(r'^\s*\d+\.\s+', '', text)
-        # Remove remaining isolated asterisks
-        text = re.sub(r'\s\*\s', ' ', text)
-        # Remove disclaimer mentions
-        text = re.sub(r'DISCLAIMER:.*$', '', text, flags=re.IGNORECASE)
-        return text.strip()
-
-    def extract_news_sentiment(self, analysis: str) -> Tuple[str, str]:
-        """Extract sentiment and brief summary from news analysis"""
-        sentiment = "Neutral"
-        summary = ""
-
-        lines = analysis.split('\n')
-        for i, line in enumerate(lines):
-            if 'SENTIMENT:' in line.upper():
-                sentiment = self._clean_text(line.split(':')[-1])
-            elif 'SUMMARY:' in line.upper():
-                # Get the next non-empty lines as summary
-                summary_lines = []
-                for j in range(i+1, min(i+4, len(lines))):
-                    if lines[j].strip() and not any(x in lines[j].upper() for x in ['SENTIMENT:', 'KEY ', 'MAJOR ', 'IMPACT ']):
-                        summary_lines.append(lines[j].strip())
-                summary = self._clean_text(' '.join(summary_lines))[:200]
-                break
-
-        if not summary:
-            # Try to get first meaningful paragraph
-            for line in lines:
-                if len(line.strip()) > 50 and not any(x in line.upper() for x in ['SENTIMENT:', 'KEY ', '**']):
-                    summary = self._clean_text(line.strip())[:200]
-                    break
-
-        return sentiment, summary
-
-    def extract_statistical_outlook(self, analysis: str) -> Tuple[str, str]:
-        """Extract trend direction and brief summary from statistical analysis"""
-        trend = "Neutral"
-        summary = ""
-
-        lines = analysis.split('\n')
-        for i, line in enumerate(lines):
-            upper_line = line.upper()
-            if 'TREND' in upper_line and ':' in line:
-                content = line.split(':')[-1].strip().lower()
-                if 'upward' in content or 'bullish' in content or 'positive' in content:
-                    trend = "Bullish"
-                elif 'downward' in content or 'bearish' in content or 'negative' in content:
-                    trend = "Bearish"
-                else:
-                    trend = "Neutral"
-            elif 'STATISTICAL INSIGHTS:' in upper_line or 'SUMMARY:' in upper_line:
-                summary_lines = []
-                for j in range(i+1, min(i+4, len(lines))):
-                    if lines[j].strip():
-                        summary_lines.append(lines[j].strip())
-                summary = self._clean_text(' '.join(summary_lines))[:200]
-                break
-
-        return trend, summary
-
-    def extract_financial_outlook(self, analysis: str) -> Tuple[str, str]:
-        """Extract valuation assessment and brief summary from financial analysis"""
-        valuation = "Fair"
-        summary = ""
-
-        lines = analysis.split('\n')
-        for i, line in enumerate(lines):
-            upper_line = line.upper()
-            if 'VALUATION' in upper_line and ':' in line:
-                content = line.split(':')[-1].strip().lower()
-                if 'undervalued' in content or 'attractive' in content:
-                    valuation = "Undervalued"
-                elif 'overvalued' in content or 'expensive' in content:
-                    valuation = "Overvalued"
-                else:
-                    valuation = "Fair"
-            elif 'INVESTMENT THESIS:' in upper_line or 'SUMMARY:' in upper_line:
-                summary_lines = []
-                for j in range(i+1, min(i+4, len(lines))):
-                    if lines[j].strip():
-                        summary_lines.append(lines[j].strip())
-                summary = self._clean_text(' '.join(summary_lines))[:200]
-                break
-
-        return valuation, summary
-
-    def generate_sparkline_svg(self, prices: List[float], width: int = 100, height: int = 40) -> str:
-        """Generate an inline SVG sparkline chart with gradient fill"""
-        if not prices or len(prices) < 2:
-            return ""
-
-        # Use last 20 days of data for smoother chart
-        prices = prices[-20:]
-
-        min_price = min(prices)
-        max_price = max(prices)
-        price_range = max_price - min_price if max_price > min_price else 1
-
-        # Add padding to prevent clipping
-        padding = 4
-        chart_width = width - (padding * 2)
-        chart_height = height - (padding * 2)
-
-        # Normalize prices to SVG coordinates
-        points = []
-        for i, price in enumerate(prices):
-            x = padding + (i / (len(prices) - 1)) * chart_width
-            y = padding + chart_height - ((price - min_price) / price_range) * chart_height
-            points.append(f"{x:.1f},{y:.1f}")
-
-        # Determine color based on trend
-        is_positive = prices[-1] >= prices[0]
-        color = "#10b981" if is_positive else "#ef4444"
-        color_light = "#34d399" if is_positive else "#f87171"
-
-        path_data = "M" + " L".join(points)
-
-        # Create area fill path (closes to bottom)
-        first_point = points[0]
-        last_point = points[-1]
-        area_path = f"M{first_point} L" + " L".join(points[1:]) + f" L{last_point.split(',')[0]},{height - padding} L{padding},{height - padding} Z"
-
-        # Unique ID for gradient
-        grad_id = f"grad_{hash(tuple(prices)) % 10000}"
-
-        return f'''<svg width="{width}" height="{height}" viewBox="0 0 {width} {height}" style="vertical-align: middle;">
-            <defs>
-                <linearGradient id="{grad_id}" x1="0%" y1="0%" x2="0%" y2="100%">
-                    <stop offset="0%" style="stop-color:{color};stop-opacity:0.3"/>
-                    <stop offset="100%" style="stop-color:{color};stop-opacity:0"/>
-                </linearGradient>
-            </defs>
-            <path d="{area_path}" fill="url(#{grad_id})"/>
-            <path d="{path_data}" fill="none" stroke="{color}" stroke-width="2" stroke-linecap="round" stroke-linejoin="round"/>
-            <circle cx="{points[-1].split(',')[0]}" cy="{points[-1].split(',')[1]}" r="3" fill="{color}"/>
-        </svg>'''
-
-    def generate_executive_summary(self, data: Dict[str, Any]) -> str:
-        """Generate a concise executive summary section"""
-        news_analysis = data['agents']['news_analyst']['analysis']
-        stats_analysis = data['agents']['statistical_expert']['analysis']
-        financial_analysis = data['agents']['financial_expert']['analysis']
-        synthesis = data['agents']['investment_synthesizer']['synthesis']
-
-        news_sentiment, news_summary = self.extract_news_sentiment(news_analysis)
-        stat_trend, stat_summary = self.extract_statistical_outlook(stats_analysis)
-        fin_outlook, fin_summary = self.extract_financial_outlook(financial_analysis)
-        recommendation, confidence = self.extract_recommendation(synthesis)
-
-        # Extract key points from synthesis
-        synthesis_summary = ""
-        lines = synthesis.split('\n')
-        for i, line in enumerate(lines):
-            if 'SUMMARY:' in line.upper():
-                summary_lines = []
-                for j in range(i+1, min(i+4, len(lines))):
-                    if lines[j].strip():
-                        summary_lines.append(lines[j].strip())
-                synthesis_summary = ' '.join(summary_lines)
-                break
-
-        if not synthesis_summary:
-            synthesis_summary = f"Based on comprehensive analysis, the recommendation is {recommendation} with {confidence} confidence."
-        else:
-            # Clean any remaining markdown from synthesis summary
-            synthesis_summary = self._clean_text(synthesis_summary)
-
-        return f'''
-        <div class="executive-summary">
-            <h2>Executive Summary</h2>
-            <div class="summary-grid">
-                <div class="summary-item news">
-                    <div class="summary-header">
-                        <span class="summary-icon">📰</span>
-                        <span class="summary-title">News Sentiment</span>
-                        <span class="summary-badge" style="background: {self._get_sentiment_color(news_sentiment)};">{news_sentiment}</span>
-                    </div>
-                    <p class="summary-text">{news_summary if news_summary else "Recent news coverage has been analyzed for market impact."}</p>
-                </div>
-                <div class="summary-item stats">
-                    <div class="summary-header">
-                        <span class="summary-icon">📊</span>
-                        <span class="summary-title">Technical Analysis</span>
-                        <span class="summary-badge" style="background: {self._get_sentiment_color(stat_trend)};">{stat_trend}</span>
-                    </div>
-                    <p class="summary-text">{stat_summary if stat_summary else "Statistical indicators have been evaluated for trend signals."}</p>
-                </div>
-                <div class="summary-item financial">
-                    <div class="summary-header">
-                        <span class="summary-icon">💰</span>
-                        <span class="summary-title">Fundamental Analysis</span>
-                        <span class="summary-badge" style="background: {self._get_valuation_color(fin_outlook)};">{fin_outlook}</span>
-                    </div>
-                    <p class="summary-text">{fin_summary if fin_summary else "Financial metrics and valuation have been assessed."}</p>
-                </div>
-            </div>
-            <div class="summary-conclusion">
-                <strong>Conclusion:</strong> {synthesis_summary}
-            </div>
-        </div>
-        '''
-
-    def _get_sentiment_color(self, sentiment: str) -> str:
-        """Get color for sentiment badge"""
-        s = sentiment.lower()
-        if 'bullish' in s or 'positive' in s:
-            return "#10b981"
-        elif 'bearish' in s or 'negative' in s:
-            return "#ef4444"
-        return "#f59e0b"
-
-    def _get_valuation_color(self, valuation: str) -> str:
-        """Get color for valuation badge"""
-        v = valuation.lower()
-        if 'undervalued' in v:
-            return "#10b981"
-        elif 'overvalued' in v:
-            return "#ef4444"
-        return "#f59e0b"
-
-    def _get_badge_class(self, sentiment: str) -> str:
-        """Get CSS class for sentiment badge"""
-        s = sentiment.lower()
-        if 'bullish' in s or 'positive' in s:
-            return "badge-bullish"
-        elif 'bearish' in s or 'negative' in s:
-            return "badge-bearish"
-        return "badge-neutral"
-
-    def _get_valuation_badge_class(self, valuation: str) -> str:
-        """Get CSS class for valuation badge"""
-        v = valuation.lower()
-        if 'undervalued' in v:
-            return "badge-undervalued"
-        elif 'overvalued' in v:
-            return "badge-overvalued"
-        return "badge-fair"
-    
-    def get_latest_analysis(self, symbol: str) -> Dict[str, Any]:
-        """Get the most recent analysis file for a symbol"""
-        pattern = f"{self.output_dir}/{symbol}_analysis_*.json"
-        files = glob(pattern)
-        
-        if not files:
-            return None
-        
-        # Get most recent file
-        latest_file = max(files, key=os.path.getctime)
-        
-        with open(latest_file, 'r') as f:
-            return json.load(f)
-    
-    def extract_recommendation(self, synthesis: str) -> tuple:
-        """Extract recommendation and confidence from synthesis"""
-        lines = synthesis.split('\n')
-        recommendation = "HOLD"
-        confidence = "Medium"
-        
-        for line in lines:
-            if line.startswith("RECOMMENDATION:"):
-                recommendation = line.split(":")[-1].strip()
-            elif line.startswith("CONFIDENCE LEVEL:"):
-                confidence = line.split(":")[-1].strip()
-        
-        return recommendation, confidence
-    
-    def get_recommendation_color(self, recommendation: str) -> str:
-        """Get color for recommendation badge"""
-        rec = recommendation.upper()
-        if "BUY" in rec:
-            return "#10b981"  # Green
-        elif "SELL" in rec:
-            return "#ef4444"  # Red
-        else:
-            return "#f59e0b"  # Orange
-    
-    def get_common_css(self, is_detail_page: bool = False) -> str:
-        """Generate common CSS styles for all pages"""
-        return """
+from typing import Dict, Any, List, Tuple, Optional, Sequence
+
+import numpy as np
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, select_autoescape
+from markupsafe import Markup, escape
+from jinja2.environment import TemplateStream
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    from plotly.offline import get_plotlyjs
+    PLOTLY_AVAILABLE = True
+except ImportError:
+    PLOTLY_AVAILABLE = False
+
+# Precompiled patterns for markdown conversion and text cleanup
+_RE_HEADER = re.compile(r'^#{1,6}\s+(.+)$', re.MULTILINE)
+_RE_BOLD = re.compile(r'\*\*([^*]+)\*\*')
+_RE_ITALIC = re.compile(r'(?<!\n)\*([^*\n]+)\*')
+_RE_OL = re.compile(r'^(\d+)\.\s+(.+)$')
+_RE_UL = re.compile(r'^[-*]\s+(.+)$')
+_RE_SECTION = re.compile(r'^[A-Z](?:[A-Z\s]|&amp;)+:$')  # matched on escaped text
+_RE_LIST_PREFIX = re.compile(r'^\s*[\*\-]\s+')
+_RE_NUM_PREFIX = re.compile(r'^\s*\d+\.\s+')
+_RE_ISOLATED_AST = re.compile(r'\s\*\s')
+_RE_DISCLAIMER = re.compile(r'DISCLAIMER:.*$', re.IGNORECASE)
+# Plotly loader tags embedded in charts saved by older analyses
+_RE_PLOTLY_CDN_TAG = re.compile(r'<script[^>]*src="https://cdn\.plot\.ly/[^"]*"[^>]*></script>')
+
+_PLOTLY_CDN = "https://cdn.plot.ly/plotly-2.27.0.min.js"
+_PLOTLY_LOCAL = "plotly.min.js"
+
+# Labeled-section extractors for agent analyses. Summary patterns capture the
+# (up to) three lines that follow the label; value patterns capture the text
+# after the last colon on the line.
+_RE_NEWS_SENTIMENT = re.compile(r'SENTIMENT:(?:.*:)?(.*)$', re.IGNORECASE | re.MULTILINE)
+_RE_NEWS_SUMMARY = re.compile(r'^(?!.*SENTIMENT:).*SUMMARY:.*$((?:\n.*){0,3})', re.IGNORECASE | re.MULTILINE)
+_RE_TREND = re.compile(r'^(?=.*TREND).*:(.*)$', re.IGNORECASE | re.MULTILINE)
+_RE_STATS_SUMMARY = re.compile(r'^(?!.*TREND).*(?:STATISTICAL INSIGHTS|SUMMARY):.*$((?:\n.*){0,3})', re.IGNORECASE | re.MULTILINE)
+_RE_VALUATION = re.compile(r'^(?=.*VALUATION).*:(.*)$', re.IGNORECASE | re.MULTILINE)
+_RE_FIN_SUMMARY = re.compile(r'^(?!.*VALUATION).*(?:INVESTMENT THESIS|SUMMARY):.*$((?:\n.*){0,3})', re.IGNORECASE | re.MULTILINE)
+_RE_NEWS_SKIP = re.compile(r'SENTIMENT:|KEY |MAJOR |IMPACT ', re.IGNORECASE)
+_RE_NEWS_FALLBACK_SKIP = re.compile(r'SENTIMENT:|KEY |\*\*', re.IGNORECASE)
+_RE_SYNTH_SUMMARY = re.compile(r'^.*SUMMARY:.*$((?:\n.*){0,3})', re.IGNORECASE | re.MULTILINE)
+_RE_REC_CONF = re.compile(r'^(RECOMMENDATION|CONFIDENCE LEVEL):(?:.*:)?(.*)$', re.MULTILINE)
+
+
+def _last_match(pattern: re.Pattern, text: str, endpos: int):
+    """Return the last match of pattern in text[:endpos], or None"""
+    m = None
+    for m in pattern.finditer(text, 0, endpos):
+        pass
+    return m
+
+
+# Computed prices in a saved analysis. orjson writes a NaN float as null, so
+# these are read back as NaN, as the json-written files were
+_NAN_STOCK_FIELDS = ('current_price', 'previous_close', 'day_change', 'day_change_percent')
+_NAN_FORECAST_FIELDS = ('next_day_prediction', 'day_10_prediction')
+
+
+def _restore_nan(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Turn the nulls orjson wrote for NaN prices back into float NaN"""
+    nan = float('nan')
+    stock = data.get('stock_data')
+    if isinstance(stock, dict):
+        for field in _NAN_STOCK_FIELDS:
+            if field in stock and stock[field] is None:
+                stock[field] = nan
+        hist = stock.get('historical_prices')
+        if isinstance(hist, dict) and None in hist.values():
+            stock['historical_prices'] = {k: nan if v is None else v for k, v in hist.items()}
+        closes = stock.get('historical_close')
+        if isinstance(closes, list) and None in closes:
+            stock['historical_close'] = [nan if v is None else v for v in closes]
+    summary = data.get('agents', {}).get('forecaster', {}).get('summary')
+    if isinstance(summary, dict):
+        for field in _NAN_FORECAST_FIELDS:
+            if field in summary and summary[field] is None:
+                summary[field] = nan
+    return data
+
+
+def _following_lines(match: re.Match) -> List[str]:
+    """Stripped, non-empty lines captured after a section label"""
+    return [line.strip() for line in match.group(1).split('\n') if line.strip()]
+
+
+@functools.lru_cache(maxsize=64)
+def _sentiment_tone(sentiment: str) -> str:
+    """Classify a sentiment/trend label as bullish, bearish or neutral"""
+    s = sentiment.lower()
+    if 'bullish' in s or 'positive' in s:
+        return 'bullish'
+    elif 'bearish' in s or 'negative' in s:
+        return 'bearish'
+    return 'neutral'
+
+
+@functools.lru_cache(maxsize=64)
+def _valuation_tone(valuation: str) -> str:
+    """Classify a valuation label as undervalued, overvalued or fair"""
+    v = valuation.lower()
+    if 'undervalued' in v:
+        return 'undervalued'
+    elif 'overvalued' in v:
+        return 'overvalued'
+    return 'fair'
+
+
+_MONTHS = ('January', 'February', 'March', 'April', 'May', 'June', 'July',
+           'August', 'September', 'October', 'November', 'December')
+
+
+def _format_analysis_date(ts: str) -> str:
+    """Format an ISO timestamp as e.g. 'February 01, 2026 at 06:32 PM'"""
+    if len(ts) < 16 or ts[4] != '-' or ts[7] != '-' or ts[13] != ':':
+        return datetime.fromisoformat(ts).strftime("%B %d, %Y at %I:%M %p")
+    hour = int(ts[11:13])
+    am_pm = 'PM' if hour >= 12 else 'AM'
+    return f"{_MONTHS[int(ts[5:7]) - 1]} {ts[8:10]}, {ts[0:4]} at {hour % 12 or 12:02d}:{ts[14:16]} {am_pm}"
+
+
+def _analysis_day(ts: str) -> str:
+    """Return the YYYY-MM-DD part of an ISO timestamp"""
+    if len(ts) >= 10 and ts[4] == '-' and ts[7] == '-':
+        return ts[:10]
+    return datetime.fromisoformat(ts).strftime("%Y-%m-%d")
+
+
+# Up/down presentation, indexed by a `value >= 0` bool
+_SIGN_CLASS = ("negative", "positive")
+_SIGN_SYMBOL = ("", "+")
+_SIGN_COLOR = ("--danger", "--success")
+
+# Stylesheet shared by the index and detail pages (written to styles.css)
+_COMMON_CSS = """
         :root {
             --primary: #6366f1;
             --primary-dark: #4f46e5;
@@ -807,34 +571,411 @@ class HTMLReportGenerator:
         }
         """
 
+
+_BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Newline plus the indentation (and blank lines) that follow it
+_RE_INDENT = re.compile(r'\n\s+')
+
+_RE_CSS_COMMENT = re.compile(r'/\*.*?\*/', re.S)
+# Whitespace around CSS punctuation that never needs it
+_RE_CSS_SPACE = re.compile(r'\s*([{};,])\s*|(:)\s+')
+_RE_STYLE_BLOCK = re.compile(r'(<style>)(.*?)(</style>)', re.S)
+
+
+def _minify_css(css: str) -> str:
+    """Drop comments and insignificant whitespace from a stylesheet"""
+    css = _RE_CSS_COMMENT.sub('', css)
+    return _RE_CSS_SPACE.sub(lambda m: m.group(1) or m.group(2), css).strip()
+
+
+# The shared stylesheet written to web_dir/styles.css
+_STYLESHEET = _minify_css(_COMMON_CSS)
+
+
+class _MinifyingLoader(FileSystemLoader):
+    """Template loader that strips source indentation and inline CSS once, before compilation"""
+
+    def get_source(self, environment, template):
+        source, filename, uptodate = super().get_source(environment, template)
+        source = _RE_STYLE_BLOCK.sub(
+            lambda m: m.group(1) + _minify_css(m.group(2)) + m.group(3), source)
+        return _RE_INDENT.sub('\n', source), filename, uptodate
+
+
+@functools.lru_cache(maxsize=None)
+def _template_env() -> Environment:
+    """Jinja2 environment for the page templates, created once per process"""
+    cache_dir = os.path.join(_BASE_DIR, '.jinja_cache')
+    os.makedirs(cache_dir, exist_ok=True)
+    env = Environment(
+        loader=_MinifyingLoader(os.path.join(_BASE_DIR, 'templates')),
+        auto_reload=False,
+        bytecode_cache=FileSystemBytecodeCache(cache_dir),
+        keep_trailing_newline=True,
+        # Plain values are escaped on output; HTML built here is passed as Markup
+        autoescape=select_autoescape(['html']),
+    )
+    return env
+
+
+@functools.lru_cache(maxsize=1024)
+def _markdown_to_html(text: str) -> str:
+    """Convert markdown formatting to HTML; memoized since reports re-render unchanged analyses"""
+    if not text:
+        return ""
+
+    # The text is LLM output quoting news feeds; escape it before adding
+    # tags, since the result is marked safe for the page template
+    text = str(escape(text))
+
+    # Fast path: a single line without markdown markers is just a paragraph
+    if '\n' not in text and '*' not in text and '#' not in text:
+        stripped = text.strip()
+        if not stripped:
+            return ""
+        first = stripped[0]
+        if first != '-' and not first.isdigit() and not stripped.endswith(':'):
+            return f'<p>{stripped}</p>'
+
+    result_lines = []
+    in_ol = False
+    in_ul = False
+
+    # Inline formatting runs over the whole text, as a header marker or bold
+    # span can run across a line break (a lone '####' line prefixes the next
+    # non-empty line); the regexes are skipped when their marker is absent
+    if '#' in text:
+        # Markdown headers (#### Header) become bold text
+        text = _RE_HEADER.sub(r'**\1**', text)
+    if '*' in text:
+        text = _RE_BOLD.sub(r'<strong>\1</strong>', text)
+        # Italic, but not a bullet at the start of a line
+        text = _RE_ITALIC.sub(r'<em>\1</em>', text)
+
+    # Single pass over the lines, each classified with cheap string checks
+    # before any regex runs
+    for line in text.split('\n'):
+        stripped = line.strip()
+        first = stripped[:1]
+
+        # Numbered list item (1. item) or bullet list item (- item)
+        ol_match = _RE_OL.match(stripped) if first.isdigit() else None
+        ul_match = _RE_UL.match(stripped) if first and first in '-*' else None
+
+        if ol_match:
+            if not in_ol:
+                if in_ul:
+                    result_lines.append('</ul>')
+                    in_ul = False
+                result_lines.append('<ol>')
+                in_ol = True
+            result_lines.append(f'<li>{ol_match.group(2)}</li>')
+        elif ul_match:
+            if not in_ul:
+                if in_ol:
+                    result_lines.append('</ol>')
+                    in_ol = False
+                result_lines.append('<ul>')
+                in_ul = True
+            result_lines.append(f'<li>{ul_match.group(1)}</li>')
+        else:
+            if in_ol:
+                result_lines.append('</ol>')
+                in_ol = False
+            if in_ul:
+                result_lines.append('</ul>')
+                in_ul = False
+            # Convert section headers (ALL CAPS followed by colon)
+            if stripped.endswith(':') and 'A' <= first <= 'Z' and _RE_SECTION.match(stripped):
+                result_lines.append(f'<h4>{stripped}</h4>')
+            elif stripped:
+                result_lines.append(f'<p>{stripped}</p>')
+            else:
+                result_lines.append('')
+
+    # Close any open lists
+    if in_ol:
+        result_lines.append('</ol>')
+    if in_ul:
+        result_lines.append('</ul>')
+
+    return '\n'.join(result_lines)
+
+
+class HTMLReportGenerator:
+    """Generates HTML reports from analysis results with modern styling"""
+
+    # Source of unique SVG gradient ids within a process
+    _grad_counter = itertools.count()
+
+    def __init__(self):
+        self.output_dir = "reports"  # Where JSON analysis files are saved
+        self.web_dir = "docs"  # GitHub Pages serves from /docs
+        # Where report pages load Plotly from; generate_all_reports switches
+        # this to a single local copy in web_dir when plotly is installed
+        self.plotly_src = _PLOTLY_CDN
+
+    def _write_text(self, filename: str, text: str):
+        """Write a generated page or asset as UTF-8"""
+        with open(filename, 'wb') as f:
+            f.write(text.encode('utf-8'))
+
+    def markdown_to_html(self, text: str) -> str:
+        """Convert markdown formatting to HTML"""
+        return _markdown_to_html(text)
+
+    def _clean_text(self, text: str) -> str:
+        """Remove markdown formatting from text"""
+        # Remove ** bold markers
+        text = text.replace('**', '')
+        # Remove list markers at start of text
+        text = _RE_LIST_PREFIX.sub('', text)
+        text = _RE_NUM_PREFIX.sub('', text)
+        # Remove remaining isolated asterisks
+        text = _RE_ISOLATED_AST.sub(' ', text)
+        # Remove disclaimer mentions
+        text = _RE_DISCLAIMER.sub('', text)
+        return text.strip()
+
+    def extract_news_sentiment(self, analysis: str) -> Tuple[str, str]:
+        """Extract sentiment and brief summary from news analysis"""
+        sentiment = "Neutral"
+        summary = ""
+
+        # Sentiment comes from the last SENTIMENT: line before the summary
+        summary_match = _RE_NEWS_SUMMARY.search(analysis)
+        end = summary_match.start() if summary_match else len(analysis)
+        sentiment_match = _last_match(_RE_NEWS_SENTIMENT, analysis, end)
+        if sentiment_match:
+            sentiment = self._clean_text(sentiment_match.group(1))
+
+        if summary_match:
+            # Get the next non-empty lines as summary; the skip words are
+            # matched on the raw line, as trailing spaces are part of them
+            summary_lines = [
+                line.strip() for line in summary_match.group(1).split('\n')
+                if line.strip() and not _RE_NEWS_SKIP.search(line)
+            ]
+            summary = self._clean_text(' '.join(summary_lines))[:200]
+
+        if not summary:
+            # Try to get first meaningful paragraph
+            for line in analysis.split('\n'):
+                stripped = line.strip()
+                if len(stripped) > 50 and not _RE_NEWS_FALLBACK_SKIP.search(line):
+                    summary = self._clean_text(stripped)[:200]
+                    break
+
+        return sentiment, summary
+
+    def extract_statistical_outlook(self, analysis: str) -> Tuple[str, str]:
+        """Extract trend direction and brief summary from statistical analysis"""
+        trend = "Neutral"
+        summary = ""
+
+        summary_match = _RE_STATS_SUMMARY.search(analysis)
+        end = summary_match.start() if summary_match else len(analysis)
+        trend_match = _last_match(_RE_TREND, analysis, end)
+        if trend_match:
+            content = trend_match.group(1).strip().lower()
+            if 'upward' in content or 'bullish' in content or 'positive' in content:
+                trend = "Bullish"
+            elif 'downward' in content or 'bearish' in content or 'negative' in content:
+                trend = "Bearish"
+
+        if summary_match:
+            summary = self._clean_text(' '.join(_following_lines(summary_match)))[:200]
+
+        return trend, summary
+
+    def extract_financial_outlook(self, analysis: str) -> Tuple[str, str]:
+        """Extract valuation assessment and brief summary from financial analysis"""
+        valuation = "Fair"
+        summary = ""
+
+        summary_match = _RE_FIN_SUMMARY.search(analysis)
+        end = summary_match.start() if summary_match else len(analysis)
+        valuation_match = _last_match(_RE_VALUATION, analysis, end)
+        if valuation_match:
+            content = valuation_match.group(1).strip().lower()
+            if 'undervalued' in content or 'attractive' in content:
+                valuation = "Undervalued"
+            elif 'overvalued' in content or 'expensive' in content:
+                valuation = "Overvalued"
+
+        if summary_match:
+            summary = self._clean_text(' '.join(_following_lines(summary_match)))[:200]
+
+        return valuation, summary
+
+    def _sparkline_parts(self, prices: Sequence[float], width: int, height: int) -> Tuple[str, str]:
+        """Build the gradient definition and drawing markup for a sparkline"""
+        # Use last 20 days of data for smoother chart
+        # (a view, not a copy, when prices is already a float64 array)
+        arr = np.asarray(prices[-20:], dtype=np.float64)
+
+        min_price = arr.min()
+        max_price = arr.max()
+        price_range = max_price - min_price if max_price > min_price else 1
+
+        # Add padding to prevent clipping
+        padding = 4
+        chart_width = width - (padding * 2)
+        chart_height = height - (padding * 2)
+
+        # Normalize prices to SVG coordinates
+        xs = padding + (np.arange(arr.size) / (arr.size - 1)) * chart_width
+        ys = padding + chart_height - ((arr - min_price) / price_range) * chart_height
+        xs = np.char.mod('%.1f', xs)
+        ys = np.char.mod('%.1f', ys)
+        points = np.char.add(np.char.add(xs, ','), ys).tolist()
+
+        # Determine color based on trend
+        is_positive = arr[-1] >= arr[0]
+        color = "#10b981" if is_positive else "#ef4444"
+        color_light = "#34d399" if is_positive else "#f87171"
+
+        path_data = "M" + " L".join(points)
+
+        # Create area fill path (closes to bottom) by extending the line path
+        last_x, last_y = xs[-1], ys[-1]
+        area_path = f"{path_data} L{last_x},{height - padding} L{padding},{height - padding} Z"
+
+        # Unique ID for gradient
+        grad_id = f"grad_{next(HTMLReportGenerator._grad_counter)}"
+
+        gradient = f'''<linearGradient id="{grad_id}" x1="0%" y1="0%" x2="0%" y2="100%">
+                    <stop offset="0%" style="stop-color:{color};stop-opacity:0.3"/>
+                    <stop offset="100%" style="stop-color:{color};stop-opacity:0"/>
+                </linearGradient>'''
+        shapes = f'''<path d="{area_path}" fill="url(#{grad_id})"/>
+            <path d="{path_data}" fill="none" stroke="{color}" stroke-width="2" stroke-linecap="round" stroke-linejoin="round"/>
+            <circle cx="{last_x}" cy="{last_y}" r="3" fill="{color}"/>'''
+        return gradient, shapes
+
+    def generate_sparkline_symbol(self, symbol: str, prices: Sequence[float], width: int = 100, height: int = 40) -> Tuple[str, str]:
+        """
+        Generate a sparkline as a reusable SVG <symbol>.
+
+        Returns:
+            (defs, use) - the gradient and <symbol> markup for the page-level
+            sprite, and the small <svg><use/></svg> reference for the card
+        """
+        if prices is None or len(prices) < 2:
+            return "", ""
+
+        gradient, shapes = self._sparkline_parts(prices, width, height)
+        symbol_id = f"spark-{symbol}"
+
+        defs = f'''{gradient}
+                <symbol id="{symbol_id}" viewBox="0 0 {width} {height}">
+            {shapes}
+                </symbol>'''
+        use = f'<svg width="{width}" height="{height}" style="vertical-align: middle;"><use href="#{symbol_id}"/></svg>'
+        return defs, use
+
+    def _get_badge_class(self, sentiment: str) -> str:
+        """Get CSS class for sentiment badge"""
+        return f"badge-{_sentiment_tone(sentiment)}"
+
+    def _get_valuation_badge_class(self, valuation: str) -> str:
+        """Get CSS class for valuation badge"""
+        return f"badge-{_valuation_tone(valuation)}"
+
+    def get_latest_analysis(self, symbol: str) -> Dict[str, Any]:
+        """Get the most recent analysis file for a symbol"""
+        prefix = f"{symbol}_analysis_"
+        latest_file = None
+        latest_ctime = -1.0
+
+        # Single directory pass; DirEntry.stat() avoids a separate lookup per path
+        try:
+            with os.scandir(self.output_dir) as entries:
+                for entry in entries:
+                    name = entry.name
+                    if name.startswith(prefix) and name.endswith('.json'):
+                        ctime = entry.stat().st_ctime
+                        if ctime > latest_ctime:
+                            latest_ctime, latest_file = ctime, entry.path
+        except FileNotFoundError:
+            return None
+
+        if latest_file is None:
+            return None
+
+        with open(latest_file, 'rb') as f:
+            raw = f.read()
+
+        if ORJSON_AVAILABLE:
+            try:
+                return _restore_nan(orjson.loads(raw))
+            except orjson.JSONDecodeError:
+                pass  # e.g. NaN values, which only the stdlib parser accepts
+        return _restore_nan(json.loads(raw))
+    
+    def extract_recommendation(self, synthesis: str) -> tuple:
+        """Extract recommendation and confidence from synthesis"""
+        recommendation = "HOLD"
+        confidence = "Medium"
+
+        # One pass over both labels; later lines override earlier ones
+        for m in _RE_REC_CONF.finditer(synthesis):
+            if m.group(1) == "RECOMMENDATION":
+                recommendation = m.group(2).strip()
+            else:
+                confidence = m.group(2).strip()
+
+        return recommendation, confidence
+    
     def generate_html(self, data: Dict[str, Any]) -> str:
         """Generate HTML report from analysis data with modern styling"""
+        return _template_env().get_template('report.html').render(self._report_context(data))
+
+    def stream_html(self, data: Dict[str, Any]) -> TemplateStream:
+        """Return the HTML report as a Jinja2 stream; .dump(path, encoding='utf-8') writes it incrementally"""
+        stream = _template_env().get_template('report.html').stream(self._report_context(data))
+        # Group the many small template events into fewer, larger writes
+        stream.enable_buffering(size=50)
+        return stream
 
+    def _report_context(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Collect the values rendered by templates/report.html"""
         symbol = data['symbol']
         company_name = data['company_name']
-        analysis_date = datetime.fromisoformat(data['analysis_date']).strftime("%B %d, %Y at %I:%M %p")
+        analysis_date = _format_analysis_date(data['analysis_date'])
 
         # Extract analyses
-        news_analysis = data['agents']['news_analyst']['analysis']
-        stats_analysis = data['agents']['statistical_expert']['analysis']
-        financial_analysis = data['agents']['financial_expert']['analysis']
-        synthesis = data['agents']['investment_synthesizer']['synthesis']
+        agents = data['agents']
+        news_analysis = agents['news_analyst']['analysis']
+        stats_analysis = agents['statistical_expert']['analysis']
+        financial_analysis = agents['financial_expert']['analysis']
+        synthesis = agents['investment_synthesizer']['synthesis']
 
         # Extract forecast data if available
-        forecast_data = data['agents'].get('forecaster', {})
-        forecast_summary = forecast_data.get('summary', {})
-        forecast_charts = forecast_data.get('charts', {})
+        forecast_data = agents.get('forecaster', {})
+        forecast_get = forecast_data.get('summary', {}).get
+        charts = forecast_data.get('charts', {})
+        forecast_chart = charts.get(
+            '1y', '<p style="text-align: center; color: var(--text-muted); padding: 40px;">Chart not available</p>')
+        if self.plotly_src == _PLOTLY_LOCAL:
+            # The page already loads the local bundle; drop the chart's own CDN fetch
+            forecast_chart = _RE_PLOTLY_CDN_TAG.sub('', forecast_chart)
+        elif '1y' in charts:
+            # Charts now share one loader tag; older analyses embed their own
+            forecast_chart = charts.get('plotlyjs', '') + forecast_chart
 
         # Get recommendation
         recommendation, confidence = self.extract_recommendation(synthesis)
-        rec_class = "rec-buy" if "BUY" in recommendation.upper() else "rec-sell" if "SELL" in recommendation.upper() else "rec-hold"
+        rec_upper = recommendation.upper()
+        rec_class = "rec-buy" if "BUY" in rec_upper else "rec-sell" if "SELL" in rec_upper else "rec-hold"
 
         # Get stock metrics
-        stock_data = data['stock_data']
-        current_price = stock_data.get('current_price', 0)
-        day_change = stock_data.get('day_change', 0)
-        day_change_pct = stock_data.get('day_change_percent', 0)
-        market_cap = stock_data.get('market_cap', 0)
+        stock_get = data['stock_data'].get
+        current_price = stock_get('current_price', 0)
+        day_change = stock_get('day_change', 0)
+        day_change_pct = stock_get('day_change_percent', 0)
+        market_cap = stock_get('market_cap', 0)
 
         # Format market cap
         if market_cap:
@@ -847,8 +988,9 @@ class HTMLReportGenerator:
         else:
             market_cap_str = "N/A"
 
-        change_class = "positive" if day_change >= 0 else "negative"
-        change_symbol = "+" if day_change >= 0 else ""
+        up = day_change >= 0
+        change_class = _SIGN_CLASS[up]
+        change_symbol = _SIGN_SYMBOL[up]
 
         # Extract summaries for executive summary
         news_sentiment, news_summary = self.extract_news_sentiment(news_analysis)
@@ -862,659 +1004,215 @@ class HTMLReportGenerator:
         # Get synthesis summary
         synthesis_summary = self._extract_synthesis_summary(synthesis, recommendation, confidence)
 
-        html = f"""
-<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>{symbol} - {company_name} | Stock Analysis</title>
-    <link rel="preconnect" href="https://fonts.googleapis.com">
-    <link rel="preconnect" href="https://fonts.gstatic.com" crossorigin>
-    <link href="https://fonts.googleapis.com/css2?family=Inter:wght@400;500;600;700;800&display=swap" rel="stylesheet">
-    <script src="https://cdn.plot.ly/plotly-2.27.0.min.js"></script>
-    <style>
-        {self.get_common_css(is_detail_page=True)}
-    </style>
-</head>
-<body>
-    <div class="container">
-        <!-- Navigation -->
-        <nav class="nav animate-in">
-            <a href="index.html" class="nav-brand">Stock Planner</a>
-            <a href="index.html" class="nav-link">
-                <svg width="16" height="16" viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2">
-                    <path d="M19 12H5M12 19l-7-7 7-7"/>
-                </svg>
-                Back to Dashboard
-            </a>
-        </nav>
-
-        <!-- Header Card -->
-        <div class="card animate-in delay-1">
-            <div style="display: flex; flex-wrap: wrap; justify-content: space-between; align-items: flex-start; gap: 24px;">
-                <div>
-                    <h1>{company_name}</h1>
-                    <h3>{symbol}</h3>
-                </div>
-                <div class="rec-badge-large {rec_class}">{recommendation}</div>
-            </div>
-
-            <div class="metrics-grid" style="margin-top: 32px;">
-                <div class="metric-card">
-                    <div class="metric-label">Current Price</div>
-                    <div class="metric-value">${current_price:.2f}</div>
-                </div>
-                <div class="metric-card">
-                    <div class="metric-label">Day Change</div>
-                    <div class="metric-value {change_class}">{change_symbol}${abs(day_change):.2f}</div>
-                    <div class="metric-sub">{change_symbol}{abs(day_change_pct):.2f}%</div>
-                </div>
-                <div class="metric-card">
-                    <div class="metric-label">Market Cap</div>
-                    <div class="metric-value">{market_cap_str}</div>
-                </div>
-                <div class="metric-card">
-                    <div class="metric-label">Confidence</div>
-                    <div class="metric-value primary">{confidence}</div>
-                </div>
-            </div>
-        </div>
-
-        <!-- Executive Summary -->
-        <div class="card animate-in delay-2">
-            <h2>Executive Summary</h2>
-            <div class="summary-grid">
-                <div class="summary-card">
-                    <div class="summary-header">
-                        <span class="summary-icon">📰</span>
-                        <span class="summary-title">News Sentiment</span>
-                        <span class="badge {news_badge_class}">{news_sentiment}</span>
-                    </div>
-                    <p class="summary-text">{news_summary if news_summary else "Recent news coverage analyzed for market impact."}</p>
-                </div>
-                <div class="summary-card">
-                    <div class="summary-header">
-                        <span class="summary-icon">📊</span>
-                        <span class="summary-title">Technical Analysis</span>
-                        <span class="badge {stat_badge_class}">{stat_trend}</span>
-                    </div>
-                    <p class="summary-text">{stat_summary if stat_summary else "Statistical indicators evaluated for trend signals."}</p>
-                </div>
-                <div class="summary-card">
-                    <div class="summary-header">
-                        <span class="summary-icon">💰</span>
-                        <span class="summary-title">Fundamental Analysis</span>
-                        <span class="badge {fin_badge_class}">{fin_outlook}</span>
-                    </div>
-                    <p class="summary-text">{fin_summary if fin_summary else "Financial metrics and valuation assessed."}</p>
-                </div>
-            </div>
-            <div class="conclusion-box">
-                <strong>Conclusion</strong>
-                <p style="margin-top: 8px; color: var(--text-muted);">{synthesis_summary}</p>
-            </div>
-        </div>
-
-        <!-- Price Forecast -->
-        <div class="card animate-in delay-3">
-            <h2>Price Forecast (10-Day)</h2>
-            <div class="metrics-grid">
-                <div class="metric-card">
-                    <div class="metric-label">Next Day</div>
-                    <div class="metric-value primary">${forecast_summary.get('next_day_prediction', current_price):.2f}</div>
-                    <div class="metric-sub">{forecast_summary.get('next_day_expected_return', 'N/A')}</div>
-                </div>
-                <div class="metric-card">
-                    <div class="metric-label">10-Day Target</div>
-                    <div class="metric-value primary">${forecast_summary.get('day_10_prediction', current_price):.2f}</div>
-                    <div class="metric-sub">{forecast_summary.get('day_10_expected_return', 'N/A')}</div>
-                </div>
-                <div class="metric-card">
-                    <div class="metric-label">Forecast Confidence</div>
-                    <div class="metric-value">{forecast_summary.get('confidence', 'N/A')}</div>
-                    <div class="metric-sub">Models: {', '.join(forecast_summary.get('models_used', ['N/A']))}</div>
-                </div>
-            </div>
-            <div class="chart-container">
-                {forecast_charts.get('1y', '<p style="text-align: center; color: var(--text-muted); padding: 40px;">Chart not available</p>')}
-            </div>
-        </div>
-
-        <!-- Detailed Analysis Sections (Collapsible) -->
-        <div class="card animate-in delay-4">
-            <h2>Detailed Analysis</h2>
-
-            <div class="collapsible" onclick="this.classList.toggle('open')">
-                <div class="collapsible-header">
-                    <div class="collapsible-title">
-                        <span class="collapsible-icon">🎯</span>
-                        Investment Synthesis
-                    </div>
-                    <div class="collapsible-toggle">
-                        <svg width="16" height="16" viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2">
-                            <path d="M6 9l6 6 6-6"/>
-                        </svg>
-                    </div>
-                </div>
-                <div class="collapsible-content">
-                    <div class="collapsible-body">{self.markdown_to_html(synthesis)}</div>
-                </div>
-            </div>
-
-            <div class="collapsible" onclick="this.classList.toggle('open')">
-                <div class="collapsible-header">
-                    <div class="collapsible-title">
-                        <span class="collapsible-icon">📰</span>
-                        News Analysis
-                    </div>
-                    <div class="collapsible-toggle">
-                        <svg width="16" height="16" viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2">
-                            <path d="M6 9l6 6 6-6"/>
-                        </svg>
-                    </div>
-                </div>
-                <div class="collapsible-content">
-                    <div class="collapsible-body">{self.markdown_to_html(news_analysis)}</div>
-                </div>
-            </div>
-
-            <div class="collapsible" onclick="this.classList.toggle('open')">
-                <div class="collapsible-header">
-                    <div class="collapsible-title">
-                        <span class="collapsible-icon">📈</span>
-                        Statistical Analysis
-                    </div>
-                    <div class="collapsible-toggle">
-                        <svg width="16" height="16" viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2">
-                            <path d="M6 9l6 6 6-6"/>
-                        </svg>
-                    </div>
-                </div>
-                <div class="collapsible-content">
-                    <div class="collapsible-body">{self.markdown_to_html(stats_analysis)}</div>
-                </div>
-            </div>
-
-            <div class="collapsible" onclick="this.classList.toggle('open')">
-                <div class="collapsible-header">
-                    <div class="collapsible-title">
-                        <span class="collapsible-icon">💼</span>
-                        Financial Analysis
-                    </div>
-                    <div class="collapsible-toggle">
-                        <svg width="16" height="16" viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2">
-                            <path d="M6 9l6 6 6-6"/>
-                        </svg>
-                    </div>
-                </div>
-                <div class="collapsible-content">
-                    <div class="collapsible-body">{self.markdown_to_html(financial_analysis)}</div>
-                </div>
-            </div>
-        </div>
-
-        <!-- Disclaimer -->
-        <div class="disclaimer animate-in delay-4">
-            <strong>Important Disclaimer</strong>
-            This analysis is generated by AI agents for educational purposes only. It should NOT be considered
-            financial advice. Always conduct your own research and consult with a qualified financial advisor
-            before making any investment decisions.
-        </div>
-
-        <!-- Footer -->
-        <div class="footer">
-            Generated on {analysis_date}
-        </div>
-    </div>
-</body>
-</html>
-"""
-        return html
+        return {
+            'symbol': symbol,
+            'company_name': company_name,
+            'analysis_date': analysis_date,
+            'recommendation': recommendation,
+            'rec_class': rec_class,
+            'confidence': confidence,
+            # Numbers are formatted here rather than with template filters
+            'current_price': f"{current_price:.2f}",
+            'day_change': f"{abs(day_change):.2f}",
+            'day_change_pct': f"{abs(day_change_pct):.2f}",
+            'change_class': change_class,
+            'change_symbol': change_symbol,
+            'market_cap_str': market_cap_str,
+            'news_sentiment': news_sentiment,
+            'news_summary': news_summary,
+            'news_badge_class': news_badge_class,
+            'stat_trend': stat_trend,
+            'stat_summary': stat_summary,
+            'stat_badge_class': stat_badge_class,
+            'fin_outlook': fin_outlook,
+            'fin_summary': fin_summary,
+            'fin_badge_class': fin_badge_class,
+            'synthesis_summary': synthesis_summary,
+            'next_day_prediction': f"{forecast_get('next_day_prediction', current_price):.2f}",
+            'next_day_expected_return': forecast_get('next_day_expected_return', 'N/A'),
+            'day_10_prediction': f"{forecast_get('day_10_prediction', current_price):.2f}",
+            'day_10_expected_return': forecast_get('day_10_expected_return', 'N/A'),
+            'forecast_confidence': forecast_get('confidence', 'N/A'),
+            'models_used': forecast_get('models_used', ['N/A']),
+            'forecast_chart': Markup(forecast_chart),
+            'plotly_src': self.plotly_src,
+            # (icon, title, body) for each collapsible detail section
+            'sections': [
+                ('🎯', 'Investment Synthesis', Markup(self.markdown_to_html(synthesis))),
+                ('📰', 'News Analysis', Markup(self.markdown_to_html(news_analysis))),
+                ('📈', 'Statistical Analysis', Markup(self.markdown_to_html(stats_analysis))),
+                ('💼', 'Financial Analysis', Markup(self.markdown_to_html(financial_analysis))),
+            ],
+        }
 
     def _extract_synthesis_summary(self, synthesis: str, recommendation: str, confidence: str) -> str:
         """Extract a brief summary from the synthesis"""
-        lines = synthesis.split('\n')
-        for i, line in enumerate(lines):
-            if 'SUMMARY:' in line.upper():
-                summary_lines = []
-                for j in range(i+1, min(i+4, len(lines))):
-                    if lines[j].strip():
-                        summary_lines.append(lines[j].strip())
-                return self._clean_text(' '.join(summary_lines))[:300]
+        summary_match = _RE_SYNTH_SUMMARY.search(synthesis)
+        if summary_match:
+            return self._clean_text(' '.join(_following_lines(summary_match)))[:300]
 
         return f"Based on comprehensive analysis, the recommendation is {recommendation} with {confidence} confidence."
     
-    def generate_index(self, symbols: list):
+    def generate_index(self, symbols: list, analyses: Optional[Dict[str, Any]] = None):
         """Generate index.html with links to all stock reports - modern dashboard"""
 
         reports = []
+        sparkline_defs = []
+        # Recommendation tally, kept while the cards are built
+        rec_counts = {'buy': 0, 'hold': 0, 'sell': 0}
+        # Bound once; these run for every symbol
+        get_latest_analysis = self.get_latest_analysis
+        sparkline_symbol = self.generate_sparkline_symbol
+        news_sentiment_of = self.extract_news_sentiment
+        statistical_outlook_of = self.extract_statistical_outlook
+        financial_outlook_of = self.extract_financial_outlook
+        recommendation_of = self.extract_recommendation
+        badge_class = self._get_badge_class
+        valuation_badge_class = self._get_valuation_badge_class
         for symbol in symbols:
-            data = self.get_latest_analysis(symbol)
+            data = analyses[symbol] if analyses is not None else get_latest_analysis(symbol)
             if data:
-                stock_data = data.get('stock_data', {})
-                current_price = stock_data.get('current_price', 0)
-                day_change = stock_data.get('day_change', 0)
-                day_change_pct = stock_data.get('day_change_percent', 0)
+                stock_get = data.get('stock_data', {}).get
+                current_price = stock_get('current_price', 0)
+                day_change = stock_get('day_change', 0)
+                day_change_pct = stock_get('day_change_percent', 0)
 
                 # Get historical prices for sparkline
-                hist_prices = stock_data.get('historical_prices', {})
-                prices = list(hist_prices.values()) if hist_prices else []
-                sparkline = self.generate_sparkline_svg(prices, width=100, height=40)
+                hist_prices = stock_get('historical_prices', {})
+                # orjson saves a missing (NaN) close as null; the float cast maps it back
+                prices = np.array(list(hist_prices.values()), dtype=np.float64)
+                spark_defs, sparkline_use = sparkline_symbol(symbol, prices, width=100, height=40)
+                if spark_defs:
+                    sparkline_defs.append(spark_defs)
 
                 # Get forecast prediction
-                forecast_data = data['agents'].get('forecaster', {})
+                agents = data['agents']
+                forecast_data = agents.get('forecaster', {})
                 forecast_summary = forecast_data.get('summary', {})
                 prediction = forecast_summary.get('day_10_prediction', current_price)
                 pred_change = ((prediction - current_price) / current_price * 100) if current_price else 0
 
                 # Get per-agent recommendations
-                news_analysis = data['agents']['news_analyst']['analysis']
-                stats_analysis = data['agents']['statistical_expert']['analysis']
-                financial_analysis = data['agents']['financial_expert']['analysis']
-                synthesis = data['agents']['investment_synthesizer']['synthesis']
-
-                news_sentiment, _ = self.extract_news_sentiment(news_analysis)
-                stat_trend, _ = self.extract_statistical_outlook(stats_analysis)
-                fin_outlook, _ = self.extract_financial_outlook(financial_analysis)
-                recommendation, confidence = self.extract_recommendation(synthesis)
-
+                news_analysis = agents['news_analyst']['analysis']
+                stats_analysis = agents['statistical_expert']['analysis']
+                financial_analysis = agents['financial_expert']['analysis']
+                synthesis = agents['investment_synthesizer']['synthesis']
+
+                news_sentiment, _ = news_sentiment_of(news_analysis)
+                stat_trend, _ = statistical_outlook_of(stats_analysis)
+                fin_outlook, _ = financial_outlook_of(financial_analysis)
+                recommendation, confidence = recommendation_of(synthesis)
+
+                rec_upper = recommendation.upper()
+                rec_class = "buy" if "BUY" in rec_upper else "sell" if "SELL" in rec_upper else "hold"
+                rec_counts[rec_class] += 1
+                up = day_change >= 0
+                pred_up = pred_change >= 0
+
+                # Agent-derived text is untrusted LLM output; the template autoescapes it
                 reports.append({
                     'symbol': symbol,
                     'company': data['company_name'],
-                    'date': datetime.fromisoformat(data['analysis_date']).strftime("%Y-%m-%d"),
+                    'date': _analysis_day(data['analysis_date']),
                     'file': f"{symbol.lower()}.html",
-                    'price': current_price,
-                    'day_change': day_change,
-                    'day_change_pct': day_change_pct,
-                    'sparkline': sparkline,
-                    'prediction': prediction,
-                    'pred_change': pred_change,
+                    'price': f"{current_price:.2f}",
+                    'day_change_pct': f"{day_change_pct:.2f}",
+                    'sparkline_use': Markup(sparkline_use),
+                    'prediction': f"{prediction:.2f}",
+                    'pred_change': f"{pred_change:.1f}",
                     'news_sentiment': news_sentiment,
                     'stat_trend': stat_trend,
                     'fin_outlook': fin_outlook,
                     'recommendation': recommendation,
-                    'confidence': confidence
+                    'confidence': confidence,
+                    'news_badge_class': badge_class(news_sentiment),
+                    'stat_badge_class': badge_class(stat_trend),
+                    'fin_badge_class': valuation_badge_class(fin_outlook),
+                    'rec_class': rec_class,
+                    'change_class': _SIGN_CLASS[up],
+                    'change_symbol': _SIGN_SYMBOL[up],
+                    'pred_symbol': _SIGN_SYMBOL[pred_up],
+                    'pred_color': _SIGN_COLOR[pred_up],
                 })
 
-        # Count recommendations for summary
-        buy_count = sum(1 for r in reports if 'BUY' in r['recommendation'].upper())
-        sell_count = sum(1 for r in reports if 'SELL' in r['recommendation'].upper())
-        hold_count = len(reports) - buy_count - sell_count
-
-        html = f"""
-<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Stock Investment Planner - AI-Powered Analysis</title>
-    <link rel="preconnect" href="https://fonts.googleapis.com">
-    <link rel="preconnect" href="https://fonts.gstatic.com" crossorigin>
-    <link href="https://fonts.googleapis.com/css2?family=Inter:wght@400;500;600;700;800&display=swap" rel="stylesheet">
-    <style>
-        {self.get_common_css()}
-
-        /* Index-specific styles */
-        .hero {{
-            text-align: center;
-            padding: 48px 32px;
-        }}
-
-        .hero h1 {{
-            font-size: 3rem;
-            background: linear-gradient(135deg, #fff 0%, #a5b4fc 100%);
-            -webkit-background-clip: text;
-            -webkit-text-fill-color: transparent;
-            background-clip: text;
-            margin-bottom: 12px;
-        }}
-
-        .hero-subtitle {{
-            color: var(--text-muted);
-            font-size: 1.125rem;
-        }}
-
-        /* Stats row */
-        .stats-row {{
-            display: grid;
-            grid-template-columns: repeat(auto-fit, minmax(200px, 1fr));
-            gap: 16px;
-            margin-bottom: 32px;
-        }}
-
-        .stat-card {{
-            background: rgba(30, 41, 59, 0.6);
-            border: 1px solid var(--border-dark);
-            border-radius: 16px;
-            padding: 24px;
-            text-align: center;
-        }}
-
-        .stat-value {{
-            font-size: 2.5rem;
-            font-weight: 800;
-        }}
-
-        .stat-label {{
-            color: var(--text-muted);
-            font-size: 0.9rem;
-            margin-top: 4px;
-        }}
-
-        /* Stock grid */
-        .stock-grid {{
-            display: grid;
-            grid-template-columns: repeat(auto-fill, minmax(380px, 1fr));
-            gap: 20px;
-        }}
-
-        .stock-card {{
-            background: rgba(30, 41, 59, 0.8);
-            backdrop-filter: blur(20px);
-            border: 1px solid var(--border-dark);
-            border-radius: 20px;
-            padding: 24px;
-            transition: all 0.3s cubic-bezier(0.4, 0, 0.2, 1);
-            cursor: pointer;
-            text-decoration: none;
-            color: inherit;
-            display: block;
-        }}
-
-        .stock-card:hover {{
-            transform: translateY(-4px);
-            border-color: var(--primary);
-            box-shadow: 0 20px 40px -15px rgba(99, 102, 241, 0.3);
-        }}
-
-        .stock-header {{
-            display: flex;
-            justify-content: space-between;
-            align-items: flex-start;
-            margin-bottom: 20px;
-        }}
-
-        .stock-info h3 {{
-            font-size: 1.5rem;
-            font-weight: 700;
-            color: var(--text-light);
-            margin-bottom: 4px;
-        }}
-
-        .stock-info .company {{
-            color: var(--text-muted);
-            font-size: 0.9rem;
-        }}
-
-        .stock-price {{
-            text-align: right;
-        }}
-
-        .stock-price .current {{
-            font-size: 1.5rem;
-            font-weight: 700;
-            color: var(--text-light);
-        }}
-
-        .stock-price .change {{
-            font-size: 0.9rem;
-            font-weight: 600;
-        }}
-
-        .stock-price .change.positive {{ color: var(--success); }}
-        .stock-price .change.negative {{ color: var(--danger); }}
-
-        .stock-chart {{
-            background: rgba(15, 23, 42, 0.5);
-            border-radius: 12px;
-            padding: 16px;
-            margin-bottom: 20px;
-            display: flex;
-            justify-content: center;
-        }}
-
-        .stock-metrics {{
-            display: grid;
-            grid-template-columns: repeat(2, 1fr);
-            gap: 12px;
-            margin-bottom: 20px;
-        }}
+        sparkline_sprite = "\n            ".join(sparkline_defs)
+
+        return _template_env().get_template('index.html').render(
+            reports=reports,
+            buy_count=rec_counts['buy'],
+            hold_count=rec_counts['hold'],
+            sell_count=rec_counts['sell'],
+            sparkline_sprite=Markup(sparkline_sprite),
+        )
+
+    def _install_plotly_js(self) -> str:
+        """Copy the plotly.js bundle into web_dir once so every page shares one cached file"""
+        data = get_plotlyjs().encode('utf-8')
+        path = os.path.join(self.web_dir, _PLOTLY_LOCAL)
+        # Binary, so the size on disk is exactly len(data) on every platform
+        if not os.path.exists(path) or os.path.getsize(path) != len(data):
+            with open(path, 'wb') as f:
+                f.write(data)
+        return _PLOTLY_LOCAL
+
+    def load_analyses(self, symbols: list) -> Dict[str, Any]:
+        """Load the latest analysis for each symbol once, for reuse across pages"""
+        return {symbol: self.get_latest_analysis(symbol) for symbol in symbols}
+
+    def _render_one(self, symbol: str, data: Optional[Dict[str, Any]]) -> Optional[str]:
+        """Render and write one symbol's report page; returns the filename, or None if no analysis"""
+        if not data:
+            return None
 
-        .stock-metric {{
-            background: rgba(15, 23, 42, 0.5);
-            border-radius: 10px;
-            padding: 12px;
-        }}
+        filename = f"{self.web_dir}/{symbol.lower()}.html"
+        # Stream straight to disk instead of building the page in memory
+        self.stream_html(data).dump(filename, encoding='utf-8')
+        return filename
 
-        .stock-metric .label {{
-            font-size: 0.75rem;
-            color: var(--text-muted);
-            text-transform: uppercase;
-            letter-spacing: 0.05em;
-        }}
-
-        .stock-metric .value {{
-            font-size: 1rem;
-            font-weight: 600;
-            color: var(--text-light);
-            margin-top: 4px;
-        }}
+    def render_all(self, symbols: list, analyses: Optional[Dict[str, Any]] = None) -> List[Optional[str]]:
+        """Render report pages for all symbols
 
-        .stock-badges {{
-            display: flex;
-            flex-wrap: wrap;
-            gap: 8px;
-            margin-bottom: 16px;
-        }}
+        Pages are rendered in-process: each one takes about a millisecond, far
+        less than starting a worker pool and shipping the analyses to it.
+        """
+        if analyses is None:
+            analyses = self.load_analyses(symbols)
+        return [self._render_one(symbol, analyses[symbol]) for symbol in symbols]
 
-        .stock-recommendation {{
-            display: flex;
-            justify-content: space-between;
-            align-items: center;
-            padding-top: 16px;
-            border-top: 1px solid var(--border-dark);
-        }}
+    def generate_all_reports(self, symbols: list):
+        """Generate HTML reports for all stocks"""
+        os.makedirs(self.web_dir, exist_ok=True)
+        
+        print("\n📝 Generating HTML reports...\n")
 
-        .rec-pill {{
-            padding: 8px 20px;
-            border-radius: 9999px;
-            font-weight: 700;
-            font-size: 0.9rem;
-            text-transform: uppercase;
-        }}
+        if PLOTLY_AVAILABLE:
+            self.plotly_src = _PLOTLY_LOCAL
 
-        .rec-pill.buy {{ background: linear-gradient(135deg, #10b981, #059669); color: white; }}
-        .rec-pill.sell {{ background: linear-gradient(135deg, #ef4444, #dc2626); color: white; }}
-        .rec-pill.hold {{ background: linear-gradient(135deg, #f59e0b, #d97706); color: white; }}
+        # Read each analysis once; the detail pages and the index share it
+        analyses = self.load_analyses(symbols)
 
-        .view-arrow {{
-            color: var(--primary-light);
-            font-weight: 600;
-            display: flex;
-            align-items: center;
-            gap: 6px;
-        }}
+        for filename in self.render_all(symbols, analyses=analyses):
+            if filename:
+                print(f"✅ Generated: {filename}")
 
-        /* Legend */
-        .legend {{
-            display: flex;
-            justify-content: center;
-            gap: 24px;
-            flex-wrap: wrap;
-            margin-top: 32px;
-            padding: 20px;
-            background: rgba(30, 41, 59, 0.4);
-            border-radius: 12px;
-        }}
+        # Static assets are written on background threads (file writes release
+        # the GIL) while the index is built
+        with ThreadPoolExecutor(max_workers=2) as io_pool:
+            # One shared stylesheet, linked from every page instead of inlined
+            asset_writes = [io_pool.submit(self._write_text, f"{self.web_dir}/styles.css",
+                                           _STYLESHEET)]
+            if PLOTLY_AVAILABLE:
+                asset_writes.append(io_pool.submit(self._install_plotly_js))
 
-        .legend-item {{
-            display: flex;
-            align-items: center;
-            gap: 8px;
-            color: var(--text-muted);
-            font-size: 0.9rem;
-        }}
-
-        .legend-dot {{
-            width: 12px;
-            height: 12px;
-            border-radius: 50%;
-        }}
-
-        @media (max-width: 768px) {{
-            .hero h1 {{ font-size: 2rem; }}
-            .stock-grid {{ grid-template-columns: 1fr; }}
-            .stats-row {{ grid-template-columns: repeat(2, 1fr); }}
-        }}
-    </style>
-</head>
-<body>
-    <div class="container">
-        <!-- Hero -->
-        <div class="card hero animate-in">
-            <h1>Stock Investment Planner</h1>
-            <p class="hero-subtitle">AI-Powered Multi-Agent Stock Analysis</p>
-        </div>
-
-        <!-- Stats Summary -->
-        <div class="stats-row animate-in delay-1">
-            <div class="stat-card">
-                <div class="stat-value" style="color: var(--success);">{buy_count}</div>
-                <div class="stat-label">Buy Signals</div>
-            </div>
-            <div class="stat-card">
-                <div class="stat-value" style="color: var(--warning);">{hold_count}</div>
-                <div class="stat-label">Hold Signals</div>
-            </div>
-            <div class="stat-card">
-                <div class="stat-value" style="color: var(--danger);">{sell_count}</div>
-                <div class="stat-label">Sell Signals</div>
-            </div>
-            <div class="stat-card">
-                <div class="stat-value" style="color: var(--primary-light);">{len(reports)}</div>
-                <div class="stat-label">Stocks Analyzed</div>
-            </div>
-        </div>
-
-        <!-- Stock Grid -->
-        <div class="stock-grid animate-in delay-2">
-"""
+            # Generate index
+            index_html = self.generate_index(symbols, analyses)
+            index_file = f"{self.web_dir}/index.html"
+            self._write_text(index_file, index_html)
 
-        for i, report in enumerate(reports):
-            news_badge_class = self._get_badge_class(report['news_sentiment'])
-            stat_badge_class = self._get_badge_class(report['stat_trend'])
-            fin_badge_class = self._get_valuation_badge_class(report['fin_outlook'])
-
-            rec_upper = report['recommendation'].upper()
-            rec_class = "buy" if "BUY" in rec_upper else "sell" if "SELL" in rec_upper else "hold"
-
-            change_class = "positive" if report['day_change'] >= 0 else "negative"
-            change_symbol = "+" if report['day_change'] >= 0 else ""
-
-            pred_class = "positive" if report['pred_change'] >= 0 else "negative"
-            pred_symbol = "+" if report['pred_change'] >= 0 else ""
-
-            html += f"""
-            <a href="{report['file']}" class="stock-card">
-                <div class="stock-header">
-                    <div class="stock-info">
-                        <h3>{report['symbol']}</h3>
-                        <div class="company">{report['company']}</div>
-                    </div>
-                    <div class="stock-price">
-                        <div class="current">${report['price']:.2f}</div>
-                        <div class="change {change_class}">{change_symbol}{report['day_change_pct']:.2f}%</div>
-                    </div>
-                </div>
-
-                <div class="stock-chart">
-                    {report['sparkline']}
-                </div>
-
-                <div class="stock-metrics">
-                    <div class="stock-metric">
-                        <div class="label">10-Day Target</div>
-                        <div class="value">${report['prediction']:.2f}</div>
-                    </div>
-                    <div class="stock-metric">
-                        <div class="label">Expected Change</div>
-                        <div class="value" style="color: var({'--success' if report['pred_change'] >= 0 else '--danger'});">{pred_symbol}{report['pred_change']:.1f}%</div>
-                    </div>
-                </div>
-
-                <div class="stock-badges">
-                    <span class="badge {news_badge_class}">{report['news_sentiment']}</span>
-                    <span class="badge {stat_badge_class}">{report['stat_trend']}</span>
-                    <span class="badge {fin_badge_class}">{report['fin_outlook']}</span>
-                </div>
-
-                <div class="stock-recommendation">
-                    <span class="rec-pill {rec_class}">{report['recommendation']}</span>
-                    <span class="view-arrow">
-                        View Details
-                        <svg width="16" height="16" viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2">
-                            <path d="M5 12h14M12 5l7 7-7 7"/>
-                        </svg>
-                    </span>
-                </div>
-            </a>
-"""
+            # Surface any write errors
+            for future in asset_writes:
+                future.result()
 
-        html += """
-        </div>
-
-        <!-- Legend -->
-        <div class="legend animate-in delay-3">
-            <div class="legend-item">
-                <div class="legend-dot" style="background: var(--success);"></div>
-                Bullish / Buy
-            </div>
-            <div class="legend-item">
-                <div class="legend-dot" style="background: var(--warning);"></div>
-                Neutral / Hold
-            </div>
-            <div class="legend-item">
-                <div class="legend-dot" style="background: var(--danger);"></div>
-                Bearish / Sell
-            </div>
-        </div>
-
-        <!-- Footer -->
-        <div class="footer">
-            <p>Powered by Ollama AI Agents</p>
-            <p style="margin-top: 8px; opacity: 0.7;">For Educational Purposes Only - Not Financial Advice</p>
-        </div>
-    </div>
-</body>
-</html>
-"""
-        return html
-    
-    def generate_all_reports(self, symbols: list):
-        """Generate HTML reports for all stocks"""
-        os.makedirs(self.web_dir, exist_ok=True)
-        
-        print("\n📝 Generating HTML reports...\n")
-        
-        for symbol in symbols:
-            data = self.get_latest_analysis(symbol)
-            if data:
-                html = self.generate_html(data)
-                filename = f"{self.web_dir}/{symbol.lower()}.html"
-                
-                with open(filename, 'w', encoding='utf-8') as f:
-                    f.write(html)
-                
-                print(f"✅ Generated: {filename}")
-        
-        # Generate index
-        index_html = self.generate_index(symbols)
-        index_file = f"{self.web_dir}/index.html"
-        
-        with open(index_file, 'w', encoding='utf-8') as f:
-            f.write(index_html)
-        
         print(f"✅ Generated: {index_file}")
         print(f"\n🎉 All reports generated in '{self.web_dir}' directory!")
         print(f"\n💡 Next steps:")
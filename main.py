@@ -5,13 +5,15 @@ Coordinates all agents and generates the final report
 
 import sys
 import os
+import traceback
 
 # Fix Windows console encoding for emoji support
 if sys.platform == "win32":
     sys.stdout.reconfigure(encoding='utf-8')
 
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 
 # Add parent directory to path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
@@ -24,10 +26,20 @@ from agents.forecaster import ForecasterAgent
 from utils.data_fetcher import DataFetcher
 from utils.ollama_client import OllamaClient
 from utils.visualizations import StockVisualizer
-from config import STOCK_SYMBOLS, STOCK_NAMES, OUTPUT_DIR
+from config import STOCK_SYMBOLS, STOCK_NAMES, OUTPUT_DIR, OLLAMA_NUM_PARALLEL
 
 import json
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+_ORJSON_OPTIONS = (
+    orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+    if ORJSON_AVAILABLE else 0
+)
 
 class StockAnalysisOrchestrator:
     """
@@ -42,6 +54,23 @@ class StockAnalysisOrchestrator:
         self.forecaster_agent = ForecasterAgent()
         self.synthesizer_agent = InvestmentSynthesizerAgent()
         self.visualizer = StockVisualizer()
+        # Forecast charts are rendered here, off the agent threads, so they
+        # never hold up the synthesis call. Several symbols' charts can render
+        # at once on the one shared visualizer; see StockVisualizer for why
+        # that is safe. Shut down by close().
+        self._chart_pool = ThreadPoolExecutor(max_workers=4)
+        # Used for combined agent requests; the shortest agent TTL applies
+        self.batch_client = OllamaClient(cache_ttl=min(
+            self.news_agent.CACHE_TTL,
+            self.stats_agent.CACHE_TTL,
+            self.financial_agent.CACHE_TTL
+        ))
+        # Filename timestamp shared by every stock saved in one batch run
+        self._run_ts = None
+        # Price histories prefetched for the current batch run, by symbol
+        self._histories = {}
+        # Created once here rather than on every save
+        os.makedirs(OUTPUT_DIR, exist_ok=True)
         
     def check_ollama(self) -> bool:
         """Check if Ollama is running"""
@@ -58,57 +87,85 @@ class StockAnalysisOrchestrator:
         Returns:
             Dictionary containing all analyses
         """
+        company_name = STOCK_NAMES.get(symbol, symbol)
+        
         print(f"\n{'='*80}")
-        print(f"🔍 Starting analysis for {symbol} - {STOCK_NAMES.get(symbol, symbol)}")
+        print(f"🔍 Starting analysis for {symbol} - {company_name}")
         print(f"{'='*80}\n")
         
         # Step 1: Fetch data
+        # Prices (Yahoo) and news (Google News RSS) come from different
+        # servers and the news search uses the configured company name,
+        # so both downloads run at the same time
         print("📊 Step 1/6: Fetching stock price data...")
-        stock_data = self.data_fetcher.get_stock_prices(symbol)
-        stock_formatted = self.data_fetcher.format_price_data_for_agent(stock_data)
-
         print("📰 Step 2/6: Fetching news data...")
-        news_data = self.data_fetcher.get_news(
-            symbol,
-            STOCK_NAMES.get(symbol, symbol)
-        )
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            stock_future = pool.submit(
+                self.data_fetcher.get_stock_prices,
+                symbol,
+                history=self._histories.get(symbol)
+            )
+            news_future = pool.submit(
+                self.data_fetcher.get_news,
+                symbol,
+                company_name
+            )
+            stock_data = stock_future.result()
+            news_data = news_future.result()
+        stock_formatted = self.data_fetcher.format_price_data_for_agent(stock_data)
         news_formatted = self.data_fetcher.format_news_for_agent(news_data)
 
         # Step 2: Run agents
+        # News, statistics, forecasting and financials are independent of each
+        # other (only the synthesizer needs all four), so they run side by side
+        # and the Ollama round-trips overlap instead of queueing.
         print("\n🤖 Running AI Agents...\n")
-
-        # News Analysis
         print("🗞️  Step 3/6: News Analysis...")
-        news_result = self.news_agent.analyze(news_formatted, symbol)
-        print("✅ News analysis complete\n")
-
-        # Statistical Analysis
         print("📈 Step 4/6: Statistical Analysis...")
-        stats_result = self.stats_agent.analyze(
-            stock_formatted,
-            stock_data.get('historical_close', []),
-            symbol
-        )
-        print("✅ Statistical analysis complete\n")
-
-        # Forecasting
         print("🔮 Step 5/6: Time Series Forecasting...")
-        forecast_result = self.forecaster_agent.analyze(
-            prices=stock_data.get('historical_close', []),
-            dates=stock_data.get('historical_dates', []),
-            symbol=symbol,
-            forecast_days=10
-        )
+        print("💼 Step 6/6: Financial Analysis...")
 
-        # Generate forecast charts
-        forecast_charts = self.visualizer.create_multi_timeframe_chart(symbol, forecast_result)
-        forecast_result['charts'] = forecast_charts
-        print("✅ Forecasting complete\n")
+        # A server that runs one request at a time gains nothing from the
+        # fan-out, so ask for the three LLM analyses in a single request and
+        # fall back to per-agent calls if that fails
+        batched = {}
+        if OLLAMA_NUM_PARALLEL == 1:
+            batched = self._batched_analyses(symbol, news_formatted, stock_formatted, stock_data) or {}
 
-        # Financial Analysis
-        print("💼 Step 6/6: Financial Analysis...")
-        financial_result = self.financial_agent.analyze(stock_formatted, symbol)
-        print("✅ Financial analysis complete\n")
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            news_future = pool.submit(
+                self.news_agent.analyze, news_formatted, symbol, batched.get('news')
+            )
+            stats_future = pool.submit(
+                self.stats_agent.analyze,
+                stock_formatted,
+                stock_data.get('historical_close', []),
+                symbol,
+                batched.get('stats')
+            )
+            forecast_future = pool.submit(
+                self.forecaster_agent.analyze,
+                prices=stock_data.get('historical_close', []),
+                dates=stock_data.get('historical_dates', []),
+                symbol=symbol,
+                forecast_days=10
+            )
+            financial_future = pool.submit(
+                self.financial_agent.analyze, stock_formatted, symbol, batched.get('financial')
+            )
+
+            news_result = news_future.result()
+            print("✅ News analysis complete\n")
+            stats_result = stats_future.result()
+            print("✅ Statistical analysis complete\n")
+            forecast_result = forecast_future.result()
+            # Charts are only needed in the final results, not by the synthesizer
+            charts_future = self._chart_pool.submit(
+                self.visualizer.create_multi_timeframe_chart, symbol, forecast_result
+            )
+            print("✅ Forecasting complete\n")
+            financial_result = financial_future.result()
+            print("✅ Financial analysis complete\n")
 
         # Synthesis (includes forecast summary in context)
         forecast_summary = f"""
@@ -125,10 +182,13 @@ FORECAST SUMMARY:
         )
         print("✅ Investment synthesis complete\n")
         
+        # Generate forecast charts
+        forecast_result['charts'] = charts_future.result()
+        
         # Compile results
         results = {
             "symbol": symbol,
-            "company_name": STOCK_NAMES.get(symbol, symbol),
+            "company_name": company_name,
             "analysis_date": datetime.now().isoformat(),
             "stock_data": stock_data,
             "news_data": news_data,
@@ -143,47 +203,99 @@ FORECAST SUMMARY:
         
         return results
     
+    def _batched_analyses(self, symbol: str, news_formatted: str, stock_formatted: str,
+                          stock_data: Dict[str, Any]) -> Optional[Dict[str, str]]:
+        """Run the news, statistical and financial prompts as one Ollama request"""
+        print("📦 Combining agent prompts into one request...")
+        return self.batch_client.generate_batch({
+            "news": (
+                self.news_agent.SYSTEM_PROMPT,
+                self.news_agent.build_prompt(news_formatted, symbol)
+            ),
+            "stats": (
+                self.stats_agent.SYSTEM_PROMPT,
+                self.stats_agent.build_prompt(
+                    stock_formatted, stock_data.get('historical_close', []), symbol
+                )
+            ),
+            "financial": (
+                self.financial_agent.SYSTEM_PROMPT,
+                self.financial_agent.build_prompt(stock_formatted, symbol)
+            ),
+        })
+    
     def save_results(self, results: Dict[str, Any], format: str = "json"):
         """Save analysis results to file"""
-        os.makedirs(OUTPUT_DIR, exist_ok=True)
-        
         symbol = results['symbol']
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        timestamp = self._run_ts or datetime.now().strftime("%Y%m%d_%H%M%S")
         
         if format == "json":
             filename = f"{OUTPUT_DIR}/{symbol}_analysis_{timestamp}.json"
-            with open(filename, 'w', encoding='utf-8') as f:
-                json.dump(results, f, indent=2, default=str)
+            if ORJSON_AVAILABLE:
+                with open(filename, 'wb') as f:
+                    f.write(orjson.dumps(results, default=str, option=_ORJSON_OPTIONS))
+            else:
+                with open(filename, 'w', encoding='utf-8') as f:
+                    json.dump(results, f, indent=2, default=str)
             print(f"📄 Results saved to: {filename}")
             return filename
         
         return None
     
+    def _analyze_and_save(self, symbol: str) -> Dict[str, Any]:
+        """Analyze one stock, save its results and return a short summary"""
+        results = self.analyze_stock(symbol)
+        
+        # Save individual stock results
+        filename = self.save_results(results)
+        
+        # The full results (price history, agent text) are on disk now; only
+        # keep what callers need so a batch doesn't hold every analysis
+        return {
+            "symbol": results["symbol"],
+            "company_name": results["company_name"],
+            "analysis_date": results["analysis_date"],
+            "file": filename
+        }
+    
     def run_all_stocks(self):
-        """Run analysis for all configured stocks"""
+        """
+        Run analysis for all configured stocks
+        
+        Returns:
+            One summary per analyzed stock (symbol, company_name,
+            analysis_date, file), or None if Ollama is not running
+        """
         if not self.check_ollama():
             print("❌ Error: Ollama is not running!")
             print("Please start Ollama with: ollama serve")
             print("And make sure you have a model installed: ollama pull llama3.1:8b")
             return None
         
+        run_started = datetime.now()
+        self._run_ts = run_started.strftime("%Y%m%d_%H%M%S")
+        
         print("\n🚀 Stock Investment Planner - Multi-Agent Analysis")
-        print(f"📅 Analysis Date: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+        print(f"📅 Analysis Date: {run_started.strftime('%Y-%m-%d %H:%M:%S')}")
+        
+        # One batched Yahoo request for every price history instead of one
+        # per symbol; analyze_stock still downloads anything missing here
+        self._histories = self.data_fetcher.download_histories(STOCK_SYMBOLS)
         
         all_results = []
         
-        for symbol in STOCK_SYMBOLS:
-            try:
-                results = self.analyze_stock(symbol)
-                all_results.append(results)
-                
-                # Save individual stock results
-                self.save_results(results)
-                
-            except Exception as e:
-                print(f"❌ Error analyzing {symbol}: {str(e)}")
-                import traceback
-                traceback.print_exc()
+        # Symbols are analyzed concurrently; OllamaClient caps the number of
+        # in-flight model requests at OLLAMA_NUM_PARALLEL
+        with ThreadPoolExecutor(max_workers=OLLAMA_NUM_PARALLEL) as pool:
+            futures = [(symbol, pool.submit(self._analyze_and_save, symbol))
+                       for symbol in STOCK_SYMBOLS]
+            for symbol, future in futures:
+                try:
+                    all_results.append(future.result())
+                except Exception as e:
+                    print(f"❌ Error analyzing {symbol}: {str(e)}")
+                    traceback.print_exc()
+        self._histories = {}
         
         print(f"\n{'='*80}")
         print("✅ Analysis complete!")
@@ -192,11 +304,19 @@ FORECAST SUMMARY:
         
         return all_results
 
+    def close(self):
+        """Wait for chart rendering to finish and stop the chart threads"""
+        self._chart_pool.shutdown(wait=True)
+        self.visualizer.flush()
+
 
 def main():
     """Main entry point"""
     orchestrator = StockAnalysisOrchestrator()
-    results = orchestrator.run_all_stocks()
+    try:
+        results = orchestrator.run_all_stocks()
+    finally:
+        orchestrator.close()
     
     if results:
         print("\n💡 Next steps:")
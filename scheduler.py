@@ -7,15 +7,24 @@ Runs the analysis automatically on a schedule
 import schedule
 import time
 import subprocess
-import sys
 import os
 from datetime import datetime
-from config import RUN_TIME, TIMEZONE
+from config import RUN_TIME, TIMEZONE, STOCK_SYMBOLS
 import pytz
 
+_BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+_MAX_SLEEP_SECONDS = 60 * 60
+# Checked once; the deploy script doesn't appear or vanish while we run
+_DEPLOY_SCRIPT = os.path.join(_BASE_DIR, "deploy_to_github.sh")
+_HAS_DEPLOY = os.path.exists(_DEPLOY_SCRIPT)
+# Built on the first run and reused, so each run doesn't leave another
+# set of agent sessions and visualizer thread pools behind
+_ORCHESTRATOR = None
+
 
 def run_analysis_job():
     """Run the analysis and log output"""
+    global _ORCHESTRATOR
     
     timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
     print(f"\n{'='*70}")
@@ -23,31 +32,27 @@ def run_analysis_job():
     print(f"{'='*70}\n")
     
     try:
-        # Run the analysis script
-        result = subprocess.run(
-            [sys.executable, "run_analysis.py"],
-            cwd=os.path.dirname(os.path.abspath(__file__)),
-            capture_output=True,
-            text=True
-        )
+        # Imported on first run rather than at startup: they pull in pandas,
+        # statsmodels, yfinance and plotly, which the idle scheduler doesn't
+        # need. Later runs in this process reuse the loaded modules.
+        from main import StockAnalysisOrchestrator
+        from generate_report import HTMLReportGenerator
         
-        print(result.stdout)
+        # Run the analysis and report generation in this process
+        if _ORCHESTRATOR is None:
+            _ORCHESTRATOR = StockAnalysisOrchestrator()
+        results = _ORCHESTRATOR.run_all_stocks()
         
-        if result.returncode == 0:
+        if results:
+            HTMLReportGenerator().generate_all_reports(STOCK_SYMBOLS)
             print(f"\n✓ Analysis completed successfully at {timestamp}")
             
-            # Optionally run git deployment
-            if os.path.exists("deploy_to_github.sh"):
+            # Optionally run git deployment (output goes straight to the console)
+            if _HAS_DEPLOY:
                 print("\nDeploying to GitHub...")
-                deploy_result = subprocess.run(
-                    ["bash", "deploy_to_github.sh"],
-                    capture_output=True,
-                    text=True
-                )
-                print(deploy_result.stdout)
+                subprocess.run(["bash", _DEPLOY_SCRIPT], cwd=_BASE_DIR)
         else:
             print(f"\n✗ Analysis failed at {timestamp}")
-            print(result.stderr)
             
     except Exception as e:
         print(f"\n✗ Error running scheduled job: {str(e)}")
@@ -56,6 +61,9 @@ def run_analysis_job():
 def main():
     """Main scheduler loop"""
     
+    # Output and deploy paths in config are relative to the project
+    os.chdir(_BASE_DIR)
+    
     print("="*70)
     print("STOCK INVESTMENT PLANNER - SCHEDULER")
     print("="*70)
@@ -79,7 +87,9 @@ def main():
     try:
         while True:
             schedule.run_pending()
-            time.sleep(60)  # Check every minute
+            # Sleep until the next job is due instead of polling every minute;
+            # capped at an hour so clock changes or a suspend are picked up
+            time.sleep(min(max(schedule.idle_seconds() or 0, 1), _MAX_SLEEP_SECONDS))
             
     except KeyboardInterrupt:
         print("\n\nScheduler stopped by user.")
@@ -0,0 +1,164 @@
+"""
+Disk caches for market data and forecasts
+
+Fetches and fits are stubbed, so nothing here touches the network.
+Run with: python -m unittest discover tests
+"""
+
+import os
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+from agents.forecaster import ForecasterAgent
+from config import FORECAST_CACHE_TTL, PRICE_CACHE_TTL
+
+try:
+    from utils import data_fetcher
+except ImportError:
+    # utils.data_fetcher needs yfinance
+    data_fetcher = None
+
+PRICES = [100.0, 101.5, 99.8, 102.3]
+DATES = ["2026-01-27", "2026-01-28", "2026-01-29", "2026-01-30"]
+
+
+class _CountingFetch:
+    """Stub fetch that records how often it is called"""
+
+    def __init__(self, result):
+        self.result = result
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return self.result
+
+
+def _expire(directory, age):
+    """Backdate every cache file in directory by age seconds"""
+    old = time.time() - age
+    for name in os.listdir(directory):
+        if name.endswith('.pkl'):
+            os.utime(os.path.join(directory, name), (old, old))
+
+
+class ForecastCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.agent = ForecasterAgent(cache_dir=self._tmp.name)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _fit(self, fit):
+        return self.agent._cached_fit("arima", fit, PRICES, DATES, 5)
+
+    def test_hit_skips_fit(self):
+        fit = _CountingFetch({"predictions": [1.0, 2.0]})
+        self.assertEqual(self._fit(fit), {"predictions": [1.0, 2.0]})
+        self.assertEqual(self._fit(fit), {"predictions": [1.0, 2.0]})
+        self.assertEqual(fit.calls, 1)
+
+    def test_expired_entry_is_refit(self):
+        fit = _CountingFetch({"predictions": [1.0]})
+        self._fit(fit)
+        _expire(self._tmp.name, FORECAST_CACHE_TTL + 60)
+        self._fit(fit)
+        self.assertEqual(fit.calls, 2)
+
+    def test_errors_are_not_stored(self):
+        fit = _CountingFetch({"error": "did not converge"})
+        self._fit(fit)
+        self._fit(fit)
+        self.assertEqual(fit.calls, 2)
+        self.assertEqual(os.listdir(self._tmp.name), [])
+
+    def test_failed_write_keeps_previous_entry(self):
+        self._fit(_CountingFetch({"predictions": [1.0]}))
+        _expire(self._tmp.name, FORECAST_CACHE_TTL + 60)
+        with mock.patch("agents.forecaster.pickle.dump", side_effect=OSError("disk full")):
+            with self.assertRaises(OSError):
+                self._fit(_CountingFetch({"predictions": [2.0]}))
+        # The old entry was never truncated; it is only replaced by a complete file
+        (entry,) = [n for n in os.listdir(self._tmp.name) if n.endswith('.pkl')]
+        os.utime(os.path.join(self._tmp.name, entry))
+        self.assertEqual(self._fit(_CountingFetch({"predictions": [3.0]})), {"predictions": [1.0]})
+
+    def test_concurrent_writers_in_one_process(self):
+        barrier = threading.Barrier(8)
+        errors = []
+
+        def fit():
+            barrier.wait()
+            return {"predictions": list(range(10000))}
+
+        def worker():
+            try:
+                self._fit(fit)
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(errors, [])
+        self.assertEqual([n for n in os.listdir(self._tmp.name) if n.endswith('.tmp')], [])
+        self.assertEqual(self._fit(_CountingFetch({})), {"predictions": list(range(10000))})
+
+
+@unittest.skipIf(data_fetcher is None, "yfinance is not installed")
+class MarketDataCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        patcher = mock.patch.object(data_fetcher, "MARKET_DATA_CACHE_DIR", self._tmp.name)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _cached(self, fetch):
+        return data_fetcher._disk_cached("price", ("TEST", 30, "2026-02-01"), PRICE_CACHE_TTL, fetch)
+
+    def test_hit_skips_fetch(self):
+        fetch = _CountingFetch({"symbol": "TEST", "current_price": 101.0})
+        self._cached(fetch)
+        self.assertEqual(self._cached(fetch), {"symbol": "TEST", "current_price": 101.0})
+        self.assertEqual(fetch.calls, 1)
+
+    def test_expired_entry_is_refetched(self):
+        fetch = _CountingFetch({"symbol": "TEST"})
+        self._cached(fetch)
+        _expire(self._tmp.name, PRICE_CACHE_TTL + 60)
+        self._cached(fetch)
+        self.assertEqual(fetch.calls, 2)
+
+    def test_errors_are_not_stored(self):
+        for result in ({"error": "no data"}, [{"error": "feed down"}]):
+            with self.subTest(result=result):
+                fetch = _CountingFetch(result)
+                self._cached(fetch)
+                self._cached(fetch)
+                self.assertEqual(fetch.calls, 2)
+                self.assertEqual(os.listdir(self._tmp.name), [])
+
+    def test_failed_write_keeps_previous_entry(self):
+        self._cached(_CountingFetch({"current_price": 1.0}))
+        _expire(self._tmp.name, PRICE_CACHE_TTL + 60)
+        with mock.patch("utils.data_fetcher.pickle.dump", side_effect=OSError("disk full")):
+            with self.assertRaises(OSError):
+                self._cached(_CountingFetch({"current_price": 2.0}))
+        (entry,) = [n for n in os.listdir(self._tmp.name) if n.endswith('.pkl')]
+        os.utime(os.path.join(self._tmp.name, entry))
+        self.assertEqual(self._cached(_CountingFetch({"current_price": 3.0})), {"current_price": 1.0})
+
+
+if __name__ == "__main__":
+    unittest.main()
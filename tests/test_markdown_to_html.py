@@ -0,0 +1,62 @@
+"""
+Regression checks for the report markdown converter
+
+Expected outputs were produced by the original whole-text implementation.
+Run with: python -m unittest discover tests
+"""
+
+import unittest
+
+from generate_report import _markdown_to_html
+
+
+class MarkdownToHtmlTest(unittest.TestCase):
+
+    def test_matches_original_output(self):
+        cases = [
+            ('####\nText',
+             '<p><strong>Text</strong></p>'),
+            ('## \n\nText',
+             '<p><strong>Text</strong></p>'),
+            ('#\r\nText',
+             '<p><strong>Text</strong></p>'),
+            ('####\nKEY RISKS:',
+             '<p><strong>KEY RISKS:</strong></p>'),
+            ('#### Valuation\n**P/E** is *high*\n* bullet\n1. one\n2. two\n- dash\nSUMMARY:',
+             '<p><strong>Valuation</strong></p>\n<p><strong>P/E</strong> is <em>high</em></p>\n'
+             '<ul>\n<li>bullet</li>\n</ul>\n<ol>\n<li>one</li>\n<li>two</li>\n</ol>\n'
+             '<ul>\n<li>dash</li>\n</ul>\n<h4>SUMMARY:</h4>'),
+            ('Plain line',
+             '<p>Plain line</p>'),
+            ('text\n*not italic*',
+             '<p>text</p>\n<p>*not italic*</p>'),
+        ]
+        for text, expected in cases:
+            with self.subTest(text=text):
+                self.assertEqual(_markdown_to_html(text), expected)
+
+    def test_escapes_analysis_text(self):
+        # The output is marked safe for the page, so markup in the text must not survive
+        html = _markdown_to_html("Outlook <script>alert('x')</script>\n**Bold <b>**\nRISKS & OPPORTUNITIES:")
+        self.assertNotIn('<script>', html)
+        self.assertNotIn('<b>', html)
+        self.assertEqual(
+            html,
+            '<p>Outlook &lt;script&gt;alert(&#39;x&#39;)&lt;/script&gt;</p>\n'
+            '<p><strong>Bold &lt;b&gt;</strong></p>\n'
+            '<h4>RISKS &amp; OPPORTUNITIES:</h4>')
+
+    def test_lone_header_marker_before_paragraph(self):
+        # Saved financial analyses can have '####' alone on a line before a paragraph
+        analysis = ("Do your own research.\n"
+                    "####\n"
+                    "The stock has faced significant headwinds recently.")
+        html = _markdown_to_html(analysis)
+        self.assertNotIn('<p>####</p>', html)
+        self.assertEqual(
+            html,
+            '<p>Do your own research.</p>\n'
+            '<p><strong>The stock has faced significant headwinds recently.</strong></p>')
+
+if __name__ == "__main__":
+    unittest.main()
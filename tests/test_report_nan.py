@@ -0,0 +1,72 @@
+"""
+Saved analyses with missing prices must still render
+
+orjson writes a NaN float as null; the report generator reads those back as NaN.
+Run with: python -m unittest discover tests
+"""
+
+import math
+import os
+import tempfile
+import unittest
+
+import orjson
+
+from generate_report import HTMLReportGenerator
+
+
+def _analysis_with_null_prices():
+    return {
+        "symbol": "TEST",
+        "company_name": "Test Corp",
+        "analysis_date": "2026-02-01T18:32:43.000000",
+        "stock_data": {
+            "current_price": float('nan'),
+            "previous_close": 100.0,
+            "day_change": float('nan'),
+            "day_change_percent": float('nan'),
+            "market_cap": None,
+            "historical_prices": {"2026-01-29": 99.0, "2026-01-30": float('nan'), "2026-02-01": 101.0},
+            "historical_close": [99.0, float('nan'), 101.0],
+        },
+        "news_data": [],
+        "agents": {
+            "news_analyst": {"analysis": "SENTIMENT: Neutral\nSUMMARY:\nQuiet week."},
+            "statistical_expert": {"analysis": "TREND ANALYSIS: Sideways"},
+            "financial_expert": {"analysis": "VALUATION: Fair"},
+            "investment_synthesizer": {"synthesis": "RECOMMENDATION: HOLD\nCONFIDENCE LEVEL: Low"},
+            "forecaster": {"summary": {"next_day_prediction": float('nan'),
+                                       "day_10_prediction": float('nan')}},
+        },
+    }
+
+
+class NullPriceReportTest(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.generator = HTMLReportGenerator()
+        self.generator.output_dir = self._tmp.name
+        path = os.path.join(self._tmp.name, "TEST_analysis_20260201_183243.json")
+        with open(path, 'wb') as f:
+            f.write(orjson.dumps(_analysis_with_null_prices()))
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_nulls_load_as_nan(self):
+        data = self.generator.get_latest_analysis("TEST")
+        self.assertTrue(math.isnan(data['stock_data']['current_price']))
+        self.assertTrue(math.isnan(data['stock_data']['historical_prices']['2026-01-30']))
+        self.assertTrue(math.isnan(data['agents']['forecaster']['summary']['day_10_prediction']))
+        # A field Yahoo can legitimately leave empty stays None
+        self.assertIsNone(data['stock_data']['market_cap'])
+
+    def test_report_and_index_render(self):
+        data = self.generator.get_latest_analysis("TEST")
+        self.assertIn("Test Corp", self.generator.generate_html(data))
+        self.assertIn("TEST", self.generator.generate_index(["TEST"], {"TEST": data}))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+"""
+One StockVisualizer shared by several chart threads
+
+Run with: python -m unittest discover tests
+"""
+
+import os
+import tempfile
+import threading
+import unittest
+
+from utils.visualizations import StockVisualizer, _matplotlib
+
+DATES = [f"2026-01-{day:02d}" for day in range(1, 31)]
+FORECAST_DATES = ["2026-01-31", "2026-02-01", "2026-02-02"]
+
+
+def _chart_args(symbol, offset):
+    prices = [100.0 + offset + i * 0.5 for i in range(len(DATES))]
+    last = prices[-1]
+    return dict(
+        symbol=symbol,
+        historical_prices=prices,
+        historical_dates=DATES,
+        forecast_values=[last + 1, last + 2, last + 3],
+        forecast_dates=FORECAST_DATES,
+        lower_bound=[last - 1, last - 2, last - 3],
+        upper_bound=[last + 3, last + 5, last + 7],
+        timeframe="1m",
+    )
+
+
+@unittest.skipIf(_matplotlib() is None, "matplotlib is not installed")
+class SharedVisualizerTest(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _render(self, visualizer, args, name):
+        path = os.path.join(self._tmp.name, name)
+        visualizer.create_forecast_plot_matplotlib(save_path=path, **args)
+        return path
+
+    def test_concurrent_charts_match_single_chart_output(self):
+        symbols = [(f"SYM{i}", i * 25) for i in range(6)]
+
+        # Each thread below draws one chart on a new figure, so each expected
+        # image is drawn on a new figure too
+        expected = {}
+        for symbol, offset in symbols:
+            alone = StockVisualizer(output_dir=self._tmp.name)
+            expected[symbol] = self._render(alone, _chart_args(symbol, offset), f"alone_{symbol}.png")
+            alone.flush()
+
+        shared = StockVisualizer(output_dir=self._tmp.name)
+        barrier = threading.Barrier(len(symbols))
+        actual, errors = {}, []
+
+        def worker(symbol, offset):
+            try:
+                barrier.wait()
+                actual[symbol] = self._render(shared, _chart_args(symbol, offset), f"threaded_{symbol}.png")
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=worker, args=item) for item in symbols]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        shared.flush()
+
+        self.assertEqual(errors, [])
+        # Any drawing shared between threads would leave another symbol's
+        # lines in the image
+        for symbol, _ in symbols:
+            with self.subTest(symbol=symbol):
+                with open(expected[symbol], 'rb') as f1, open(actual[symbol], 'rb') as f2:
+                    self.assertEqual(f1.read(), f2.read())
+
+
+if __name__ == "__main__":
+    unittest.main()
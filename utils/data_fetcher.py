@@ -2,38 +2,162 @@
 Data Fetcher - Gets stock prices and news from free APIs
 """
 
+import hashlib
+import os
+import pickle
+import tempfile
+import time
+import xml.etree.ElementTree as ET
+from email.utils import parsedate_to_datetime
+import numpy as np
+import pandas as pd
 import yfinance as yf
 import requests
-from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional
-import feedparser
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List, Any, Optional
 from urllib.parse import quote
-from config import ALPHA_VANTAGE_API_KEY, NEWS_API_KEY, DAYS_OF_PRICE_DATA, NEWS_LOOKBACK_DAYS
+from config import (ALPHA_VANTAGE_API_KEY, NEWS_API_KEY, DAYS_OF_PRICE_DATA, NEWS_LOOKBACK_DAYS,
+                    MARKET_DATA_CACHE_DIR, PRICE_CACHE_TTL, NEWS_CACHE_TTL)
+
+
+# Reused across symbols so the news feed keeps one TLS connection open
+_NEWS_SESSION = requests.Session()
+
+
+def _parse_pub_date(value: Optional[str]) -> Optional[datetime]:
+    """RSS pubDate (RFC 822) as a naive UTC datetime, or None if unparseable"""
+    if not value:
+        return None
+    try:
+        parsed = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def _cache_path(kind: str, key: tuple) -> str:
+    """File holding the cached result for a fetch key"""
+    digest = hashlib.sha256(repr(key).encode()).hexdigest()[:32]
+    return os.path.join(MARKET_DATA_CACHE_DIR, f"{kind}_{digest}.pkl")
+
+
+def _is_fresh(path: str, ttl: int) -> bool:
+    """Whether a cache file exists and is younger than ttl seconds"""
+    try:
+        return time.time() - os.path.getmtime(path) < ttl
+    except OSError:
+        return False
+
+
+def _price_key(symbol: str, days: int) -> tuple:
+    """Price histories are cached per symbol, window and calendar day"""
+    return (symbol, days, datetime.now().date().isoformat())
+
+
+def _disk_cached(kind: str, key: tuple, ttl: int, fetch: Callable[[], Any]) -> Any:
+    """
+    Return a fetch result from the disk cache if it is younger than ttl
+    seconds, otherwise call fetch() and store what it returns.
+
+    Error results are never stored, so a failed download is retried next time.
+    """
+    path = _cache_path(kind, key)
+
+    try:
+        if _is_fresh(path, ttl):
+            with open(path, 'rb') as f:
+                return pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError):
+        pass
+
+    result = fetch()
+    failed = "error" in result if isinstance(result, dict) else bool(result and "error" in result[0])
+    if not failed:
+        os.makedirs(MARKET_DATA_CACHE_DIR, exist_ok=True)
+        # A unique temp file per writer: threads of one process share a pid
+        with tempfile.NamedTemporaryFile('wb', dir=MARKET_DATA_CACHE_DIR, suffix='.tmp', delete=False) as f:
+            pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(f.name, path)
+    return result
 
 
 class DataFetcher:
     """Fetches stock data and news from free sources"""
     
     @staticmethod
-    def get_stock_prices(symbol: str, days: int = DAYS_OF_PRICE_DATA) -> Dict[str, Any]:
+    def download_histories(symbols: List[str], days: int = DAYS_OF_PRICE_DATA) -> Dict[str, pd.DataFrame]:
+        """
+        Download price histories for several symbols in one batched request
+        
+        Symbols whose price data is still in the disk cache are skipped.
+        Pass each frame to get_stock_prices(history=...) so it doesn't
+        download the history again.
+        
+        Args:
+            symbols: Stock ticker symbols
+            days: Number of days of historical data
+            
+        Returns:
+            Symbol -> daily OHLCV frame (missing symbols are left out)
+        """
+        missing = [s for s in symbols
+                   if not _is_fresh(_cache_path("prices", _price_key(s, days)), PRICE_CACHE_TTL)]
+        if len(missing) < 2:
+            return {}
+        
+        end_date = datetime.now()
+        start_date = end_date - timedelta(days=days)
+        try:
+            # auto_adjust matches Ticker.history's default
+            data = yf.download(missing, start=start_date, end=end_date, group_by='ticker',
+                               auto_adjust=True, threads=True, progress=False)
+        except Exception as e:
+            print(f"⚠️  Batched price download failed: {e}")
+            return {}
+        
+        histories = {}
+        for symbol in missing:
+            if symbol in data.columns.get_level_values(0):
+                hist = data[symbol].dropna(how='all')
+                if not hist.empty:
+                    histories[symbol] = hist
+        return histories
+    
+    @staticmethod
+    def get_stock_prices(symbol: str, days: int = DAYS_OF_PRICE_DATA,
+                         history: Optional[pd.DataFrame] = None) -> Dict[str, Any]:
         """
         Fetch historical stock prices using yfinance (100% free)
         
+        Re-runs on the same day reuse the download for PRICE_CACHE_TTL seconds.
+        
         Args:
             symbol: Stock ticker symbol (e.g., 'GOOGL')
             days: Number of days of historical data
+            history: Price history already fetched by download_histories
             
         Returns:
             Dictionary with price data
         """
+        return _disk_cached("prices", _price_key(symbol, days), PRICE_CACHE_TTL,
+                            lambda: DataFetcher._download_stock_prices(symbol, days, history))
+    
+    @staticmethod
+    def _download_stock_prices(symbol: str, days: int,
+                               history: Optional[pd.DataFrame] = None) -> Dict[str, Any]:
+        """Download price history and company info from Yahoo Finance"""
         try:
             stock = yf.Ticker(symbol)
             
-            # Get historical data
-            end_date = datetime.now()
-            start_date = end_date - timedelta(days=days)
-            
-            hist = stock.history(start=start_date, end=end_date)
+            # Get historical data, unless it came from a batched download
+            if history is not None and not history.empty:
+                hist = history
+            else:
+                end_date = datetime.now()
+                start_date = end_date - timedelta(days=days)
+                hist = stock.history(start=start_date, end=end_date)
             
             if hist.empty:
                 return {"error": f"No data found for {symbol}"}
@@ -41,23 +165,32 @@ class DataFetcher:
             # Get current info
             info = stock.info
             
+            # Vectorized date formatting instead of a per-row str(date.date())
+            dates = hist.index.strftime('%Y-%m-%d').tolist()
+            closes = hist['Close'].to_numpy().tolist()
+            
+            # Quote from Yahoo, falling back to the last two closes
+            current = info.get("currentPrice") or closes[-1]
+            previous = info.get("previousClose") or (closes[-2] if len(closes) > 1 else current)
+            day_change = current - previous
+            
             return {
                 "symbol": symbol,
                 "company_name": info.get("longName", symbol),
-                "current_price": info.get("currentPrice", hist['Close'].iloc[-1]),
-                "previous_close": info.get("previousClose", hist['Close'].iloc[-2] if len(hist) > 1 else None),
-                "day_change": info.get("currentPrice", hist['Close'].iloc[-1]) - info.get("previousClose", hist['Close'].iloc[-2] if len(hist) > 1 else 0),
-                "day_change_percent": ((info.get("currentPrice", hist['Close'].iloc[-1]) - info.get("previousClose", hist['Close'].iloc[-2] if len(hist) > 1 else 0)) / info.get("previousClose", hist['Close'].iloc[-2] if len(hist) > 1 else 1)) * 100,
+                "current_price": current,
+                "previous_close": previous,
+                "day_change": day_change,
+                "day_change_percent": (day_change / previous * 100.0) if previous else 0.0,
                 "market_cap": info.get("marketCap"),
                 "pe_ratio": info.get("trailingPE"),
                 "52_week_high": info.get("fiftyTwoWeekHigh"),
                 "52_week_low": info.get("fiftyTwoWeekLow"),
                 "volume": info.get("volume"),
                 "avg_volume": info.get("averageVolume"),
-                "historical_prices": {str(k): v for k, v in hist['Close'].to_dict().items()},
-                "historical_dates": [str(date.date()) for date in hist.index],
-                "historical_close": hist['Close'].tolist(),
-                "historical_volume": hist['Volume'].tolist(),
+                "historical_prices": dict(zip(dates, closes)),
+                "historical_dates": dates,
+                "historical_close": closes,
+                "historical_volume": hist['Volume'].to_numpy().tolist(),
                 "sector": info.get("sector", "Unknown"),
                 "industry": info.get("industry", "Unknown"),
                 "description": info.get("longBusinessSummary", ""),
@@ -72,6 +205,8 @@ class DataFetcher:
         Fetch recent news about the stock
         Uses Google News RSS (free, no API key needed)
         
+        Repeated calls reuse the fetched feed for NEWS_CACHE_TTL seconds.
+        
         Args:
             symbol: Stock ticker symbol
             company_name: Company name for better search results
@@ -80,6 +215,12 @@ class DataFetcher:
         Returns:
             List of news articles
         """
+        return _disk_cached("news", (symbol, company_name, days), NEWS_CACHE_TTL,
+                            lambda: DataFetcher._download_news(symbol, company_name, days))
+    
+    @staticmethod
+    def _download_news(symbol: str, company_name: Optional[str], days: int) -> List[Dict[str, Any]]:
+        """Fetch and filter the Google News RSS feed"""
         news_items = []
         
         # Use company name if available, otherwise symbol
@@ -90,26 +231,29 @@ class DataFetcher:
             encoded_term = quote(search_term)
             url = f"https://news.google.com/rss/search?q={encoded_term}+stock&hl=en-US&gl=US&ceid=US:en"
             
-            feed = feedparser.parse(url)
+            response = _NEWS_SESSION.get(url, timeout=10)
+            response.raise_for_status()
+            # The feed is flat RSS 2.0, so the C-accelerated ElementTree
+            # parser is enough (and much faster than feedparser)
+            channel = ET.fromstring(response.content).find('channel')
+            items = channel.findall('item') if channel is not None else []
             
             cutoff_date = datetime.now() - timedelta(days=days)
             
-            for entry in feed.entries[:10]:  # Limit to top 10
+            for item in items[:10]:  # Limit to top 10
                 # Parse published date
-                pub_date = None
-                if hasattr(entry, 'published_parsed'):
-                    pub_date = datetime(*entry.published_parsed[:6])
+                pub_date = _parse_pub_date(item.findtext('pubDate'))
                 
                 # Only include recent news
                 if pub_date and pub_date < cutoff_date:
                     continue
                 
                 news_items.append({
-                    "title": entry.get("title", ""),
-                    "link": entry.get("link", ""),
+                    "title": item.findtext("title", ""),
+                    "link": item.findtext("link", ""),
                     "published": pub_date.isoformat() if pub_date else "Unknown",
-                    "source": entry.get("source", {}).get("title", "Unknown"),
-                    "summary": entry.get("summary", "")
+                    "source": item.findtext("source") or "Unknown",
+                    "summary": item.findtext("description", "")
                 })
             
             return news_items
@@ -124,6 +268,14 @@ class DataFetcher:
         if "error" in data:
             return f"Error: {data['error']}"
         
+        market_cap = f"${data['market_cap']:,}" if data['market_cap'] else 'N/A'
+        pe_ratio = f"{data['pe_ratio']:.2f}" if data['pe_ratio'] else 'N/A'
+        high_52w = f"${data['52_week_high']:.2f}" if data['52_week_high'] else 'N/A'
+        low_52w = f"${data['52_week_low']:.2f}" if data['52_week_low'] else 'N/A'
+        volume = f"{data['volume']:,}" if data['volume'] else 'N/A'
+        avg_volume = f"{data['avg_volume']:,}" if data['avg_volume'] else 'N/A'
+        recent_prices = np.char.mod('$%.2f', np.asarray(data['historical_close'][-10:], dtype=np.float64))
+        
         output = f"""
 STOCK PRICE DATA FOR {data['symbol']} - {data['company_name']}
 
@@ -131,17 +283,17 @@ Current Information (as of {data['fetched_at']}):
 - Current Price: ${data['current_price']:.2f}
 - Previous Close: ${data['previous_close']:.2f}
 - Day Change: ${data['day_change']:.2f} ({data['day_change_percent']:.2f}%)
-- Market Cap: ${data['market_cap']:,} if data['market_cap'] else 'N/A'
-- P/E Ratio: {data['pe_ratio']:.2f} if data['pe_ratio'] else 'N/A'
-- 52 Week High: ${data['52_week_high']:.2f}
-- 52 Week Low: ${data['52_week_low']:.2f}
-- Volume: {data['volume']:,}
-- Average Volume: {data['avg_volume']:,}
+- Market Cap: {market_cap}
+- P/E Ratio: {pe_ratio}
+- 52 Week High: {high_52w}
+- 52 Week Low: {low_52w}
+- Volume: {volume}
+- Average Volume: {avg_volume}
 - Sector: {data['sector']}
 - Industry: {data['industry']}
 
 Historical Prices (Last {len(data['historical_close'])} days):
-{', '.join([f"${price:.2f}" for price in data['historical_close'][-10:]])}...
+{', '.join(recent_prices.tolist())}...
 
 Company Description:
 {data['description'][:500]}...
@@ -157,15 +309,17 @@ Company Description:
         if "error" in news_items[0]:
             return f"Error: {news_items[0]['error']}"
         
-        output = f"RECENT NEWS ({len(news_items)} articles):\n\n"
+        parts = [f"RECENT NEWS ({len(news_items)} articles):\n"]
         
         for i, item in enumerate(news_items, 1):
-            output += f"{i}. {item['title']}\n"
-            output += f"   Source: {item['source']} | Published: {item['published']}\n"
-            output += f"   {item['summary'][:200]}...\n"
-            output += f"   Link: {item['link']}\n\n"
+            parts.append(
+                f"{i}. {item['title']}\n"
+                f"   Source: {item['source']} | Published: {item['published']}\n"
+                f"   {item['summary'][:200]}...\n"
+                f"   Link: {item['link']}\n"
+            )
         
-        return output
+        return "\n".join(parts) + "\n"
 
 
 if __name__ == "__main__":
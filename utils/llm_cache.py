@@ -0,0 +1,71 @@
+"""
+LLM Cache - Disk-backed cache of Ollama responses keyed on the full request
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from config import LLM_CACHE_PATH
+
+
+class SQLiteCache:
+    """SQLite store of generated responses, safe to share between threads"""
+
+    def __init__(self, path: str = LLM_CACHE_PATH):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS llm_cache("
+            "key TEXT PRIMARY KEY, response BLOB, ts INTEGER)"
+        )
+        self._conn.commit()
+
+    # Transport settings that do not change the generated text
+    _UNKEYED_FIELDS = ("stream", "keep_alive")
+
+    @classmethod
+    def make_key(cls, payload: Dict[str, Any]) -> str:
+        """Hash the request payload, i.e. everything that affects the generated text"""
+        keyed = {k: v for k, v in payload.items() if k not in cls._UNKEYED_FIELDS}
+        raw = json.dumps(keyed, sort_keys=True, ensure_ascii=False)
+        return hashlib.blake2b(raw.encode("utf-8"), digest_size=32).hexdigest()
+
+    def get(self, key: str, ttl: int) -> Optional[str]:
+        """Return the cached response if it is younger than ttl seconds"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response, ts FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None or time.time() - row[1] > ttl:
+            return None
+        return row[0].decode("utf-8")
+
+    def set(self, key: str, response: str):
+        """Store a response, replacing any older entry"""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache(key, response, ts) VALUES (?, ?, ?)",
+                (key, response.encode("utf-8"), int(time.time()))
+            )
+            self._conn.commit()
+
+
+_CACHE: Optional[SQLiteCache] = None
+_CACHE_LOCK = threading.Lock()
+
+
+def get_cache() -> SQLiteCache:
+    """Shared cache instance, opened on first use"""
+    global _CACHE
+    with _CACHE_LOCK:
+        if _CACHE is None:
+            _CACHE = SQLiteCache()
+        return _CACHE
@@ -4,23 +4,88 @@ Ollama Client - Handles all communication with local Ollama instance
 
 import requests
 import json
-from typing import Optional, Dict, Any
-from config import OLLAMA_BASE_URL, OLLAMA_MODEL, MAX_TOKENS, TEMPERATURE
+import threading
+import time
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from typing import Optional, Dict, Any, Iterator, Tuple
+from config import OLLAMA_BASE_URL, OLLAMA_MODEL, OLLAMA_NUM_PARALLEL, OLLAMA_KEEP_ALIVE, MAX_TOKENS, TEMPERATURE
+from utils.llm_cache import SQLiteCache, get_cache
+
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
+
+# Shared by every client so concurrent agents never queue more requests
+# than the server can actually run at once
+_REQUEST_SLOTS = threading.BoundedSemaphore(OLLAMA_NUM_PARALLEL)
+
+# One keep-alive connection pool for all clients instead of a new TCP
+# connection per request
+_SESSION = requests.Session()
+_SESSION.mount("http://", HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=max(16, OLLAMA_NUM_PARALLEL * 2),
+    max_retries=Retry(total=3, backoff_factor=0.2)
+))
+
+
+# Seconds a successful /api/tags answer is reused by status and model checks
+_TAGS_TTL = 30
+_TAGS_CACHE: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+_TAGS_LOCK = threading.Lock()
+
+
+def _tags(base_url: str) -> Dict[str, Any]:
+    """Fetch the server's model list, reusing a recent answer. Failures
+    raise, so they are not cached and the next check retries (e.g. after
+    `ollama serve` starts)"""
+    now = time.monotonic()
+    with _TAGS_LOCK:
+        hit = _TAGS_CACHE.get(base_url)
+    if hit is not None and now - hit[0] < _TAGS_TTL:
+        return hit[1]
+    response = _SESSION.get(f"{base_url}/api/tags", timeout=2)
+    response.raise_for_status()
+    data = response.json()
+    with _TAGS_LOCK:
+        _TAGS_CACHE[base_url] = (now, data)
+    return data
 
 
 class OllamaClient:
     """Client for interacting with local Ollama instance"""
     
-    def __init__(self, base_url: str = OLLAMA_BASE_URL, model: str = OLLAMA_MODEL):
+    def __init__(self, base_url: str = OLLAMA_BASE_URL, model: str = OLLAMA_MODEL,
+                 cache_ttl: Optional[int] = None,
+                 session: Optional[requests.Session] = None):
         self.base_url = base_url
         self.model = model
         self.endpoint = f"{base_url}/api/generate"
+        # Seconds a cached response stays valid; None disables caching
+        self.cache_ttl = cache_ttl
+        # Defaults to the shared pooled session; a caller-supplied one is
+        # owned by this client and closed with it
+        self._session = session or _SESSION
+    
+    def close(self):
+        """Release the client's own session (the shared pool stays open)"""
+        if self._session is not _SESSION:
+            self._session.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
         
     def is_available(self) -> bool:
         """Check if Ollama is running"""
         try:
-            response = requests.get(f"{self.base_url}/api/tags", timeout=5)
-            return response.status_code == 200
+            _tags(self.base_url)
+            return True
         except Exception as e:
             print(f"❌ Ollama not available: {e}")
             return False
@@ -29,7 +94,8 @@ class OllamaClient:
                  prompt: str, 
                  system_prompt: Optional[str] = None,
                  temperature: float = TEMPERATURE,
-                 max_tokens: int = MAX_TOKENS) -> str:
+                 max_tokens: int = MAX_TOKENS,
+                 use_cache: bool = True) -> str:
         """
         Generate a response from Ollama
         
@@ -38,43 +104,177 @@ class OllamaClient:
             system_prompt: Optional system instructions for the agent
             temperature: Sampling temperature (0-1)
             max_tokens: Maximum tokens to generate
+            use_cache: Set False to always ask the model for a fresh answer
             
         Returns:
             Generated text response
         """
         
-        # Combine system prompt and user prompt
-        full_prompt = prompt
-        if system_prompt:
-            full_prompt = f"{system_prompt}\n\n{prompt}"
+        payload = self._payload(prompt, system_prompt, temperature, max_tokens)
+        
+        cache_key = None
+        if use_cache and self.cache_ttl:
+            cache_key = SQLiteCache.make_key(payload)
+            cached = get_cache().get(cache_key, self.cache_ttl)
+            if cached is not None:
+                return cached
         
+        try:
+            text = self._stream(payload)
+            if cache_key is not None:
+                get_cache().set(cache_key, text)
+            return text
+        except requests.exceptions.RequestException as e:
+            print(f"❌ Error calling Ollama: {e}")
+            return f"Error: Could not generate response - {str(e)}"
+    
+    def generate_stream(self,
+                        prompt: str,
+                        system_prompt: Optional[str] = None,
+                        temperature: float = TEMPERATURE,
+                        max_tokens: int = MAX_TOKENS,
+                        use_cache: bool = True) -> Iterator[str]:
+        """
+        Yield a response from Ollama chunk by chunk as it is generated
+        
+        Takes the same arguments as generate(). A cached answer is yielded
+        as a single chunk, and a completed stream is cached. Stopping the
+        iteration early closes the request. Unlike generate(), connection
+        errors are raised (requests.exceptions.RequestException).
+        """
+        payload = self._payload(prompt, system_prompt, temperature, max_tokens)
+        
+        cache_key = None
+        if use_cache and self.cache_ttl:
+            cache_key = SQLiteCache.make_key(payload)
+            cached = get_cache().get(cache_key, self.cache_ttl)
+            if cached is not None:
+                yield cached
+                return
+        
+        chunks = []
+        for chunk in self._iter_chunks(payload):
+            chunks.append(chunk)
+            yield chunk
+        if cache_key is not None:
+            get_cache().set(cache_key, "".join(chunks))
+    
+    def _payload(self, prompt: str, system_prompt: Optional[str],
+                 temperature: float, max_tokens: int) -> Dict[str, Any]:
+        """Request body for a single-prompt generate call"""
+        # The system prompt goes in its own field: Ollama puts it first in
+        # the model's template, so the unchanged prefix of an agent's calls
+        # is reused from the KV cache while the model stays loaded
         payload = {
             "model": self.model,
-            "prompt": full_prompt,
-            "stream": False,
+            "prompt": prompt,
+            "stream": True,
+            "keep_alive": OLLAMA_KEEP_ALIVE,
             "options": {
                 "temperature": temperature,
                 "num_predict": max_tokens
             }
         }
+        if system_prompt:
+            payload["system"] = system_prompt
+        return payload
+    
+    def generate_batch(self,
+                       prompts: Dict[str, Tuple[Optional[str], str]],
+                       temperature: float = TEMPERATURE,
+                       max_tokens: int = MAX_TOKENS) -> Optional[Dict[str, str]]:
+        """
+        Answer several independent prompts with a single Ollama request
+        
+        Worth it when the server only runs one request at a time
+        (OLLAMA_NUM_PARALLEL=1): the prompts share one queue slot instead of
+        waiting behind each other. The model is asked for a JSON object with
+        one field per prompt, and Ollama's JSON mode keeps the reply parseable.
+        
+        Args:
+            prompts: Maps a result key to its (system_prompt, prompt) pair
+            temperature: Sampling temperature (0-1)
+            max_tokens: Maximum tokens to generate per prompt
+            
+        Returns:
+            The same keys mapped to response text, or None if the request
+            failed or the reply was incomplete (callers fall back to generate)
+        """
+        keys = ", ".join(f'"{key}"' for key in prompts)
+        tasks = "\n\n".join(
+            f'=== TASK "{key}" ===\n{system_prompt}\n\n{prompt}' if system_prompt
+            else f'=== TASK "{key}" ===\n{prompt}'
+            for key, (system_prompt, prompt) in prompts.items()
+        )
+        batch_prompt = (
+            "Complete each task below independently.\n"
+            f"Reply with one JSON object with the keys {keys}. Each value must be "
+            "the full plain-text answer to that task, in the format the task asks for.\n\n"
+            f"{tasks}"
+        )
+        payload = {
+            "model": self.model,
+            "prompt": batch_prompt,
+            "format": "json",
+            "stream": True,
+            "keep_alive": OLLAMA_KEEP_ALIVE,
+            "options": {
+                "temperature": temperature,
+                "num_predict": max_tokens * len(prompts)
+            }
+        }
+        
+        cache_key = None
+        text = None
+        if self.cache_ttl:
+            cache_key = SQLiteCache.make_key(payload)
+            text = get_cache().get(cache_key, self.cache_ttl)
+        
+        if text is None:
+            try:
+                text = self._stream(payload)
+            except requests.exceptions.RequestException as e:
+                print(f"⚠️  Batched Ollama call failed: {e}")
+                return None
         
         try:
-            response = requests.post(self.endpoint, json=payload, timeout=120)
+            data = _loads(text)
+        except ValueError:
+            return None
+        if not isinstance(data, dict) or not all(
+                isinstance(data.get(key), str) and data[key].strip() for key in prompts):
+            return None
+        
+        if cache_key is not None:
+            get_cache().set(cache_key, text)
+        return {key: data[key] for key in prompts}
+    
+    def _stream(self, payload: Dict[str, Any]) -> str:
+        """POST a streaming generate request and join the response chunks"""
+        return "".join(self._iter_chunks(payload))
+    
+    def _iter_chunks(self, payload: Dict[str, Any]) -> Iterator[str]:
+        """POST a streaming generate request and yield the text chunks"""
+        # Stream tokens as they are produced: the read timeout then
+        # applies between chunks rather than to the whole completion
+        with _REQUEST_SLOTS, self._session.post(self.endpoint, json=payload,
+                                                stream=True, timeout=(10, 120)) as response:
             response.raise_for_status()
-            result = response.json()
-            return result.get("response", "")
-        except requests.exceptions.RequestException as e:
-            print(f"❌ Error calling Ollama: {e}")
-            return f"Error: Could not generate response - {str(e)}"
+            for line in response.iter_lines():
+                if not line:
+                    continue
+                chunk = _loads(line)
+                if "error" in chunk:
+                    raise requests.exceptions.RequestException(chunk["error"])
+                yield chunk.get("response", "")
+                if chunk.get("done"):
+                    break
     
     def list_models(self) -> list:
         """List available models in Ollama"""
         try:
-            response = requests.get(f"{self.base_url}/api/tags")
-            if response.status_code == 200:
-                data = response.json()
-                return [model["name"] for model in data.get("models", [])]
-            return []
+            data = _tags(self.base_url)
+            return [model["name"] for model in data.get("models", [])]
         except Exception as e:
             print(f"Error listing models: {e}")
             return []
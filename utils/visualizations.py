@@ -3,38 +3,224 @@ Visualization utilities for stock analysis and forecasting
 Generates interactive plots for time series data and forecasts
 """
 
+import io
 import os
 import json
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional
+import functools
+import hashlib
+import secrets
+import threading
+from collections import ChainMap, OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Optional, Union
 import numpy as np
 
-try:
-    import plotly.graph_objects as go
-    from plotly.subplots import make_subplots
-    PLOTLY_AVAILABLE = True
-except ImportError:
-    PLOTLY_AVAILABLE = False
 
-try:
-    import matplotlib
-    matplotlib.use('Agg')  # Non-interactive backend
-    import matplotlib.pyplot as plt
-    import matplotlib.dates as mdates
-    MATPLOTLIB_AVAILABLE = True
-except ImportError:
-    MATPLOTLIB_AVAILABLE = False
+# Plotting libraries are imported on first use: they are slow to import and
+# not needed by callers that never draw a chart
+@functools.lru_cache(maxsize=1)
+def _plotly():
+    """plotly.graph_objects, or None if Plotly is not installed"""
+    try:
+        import plotly.graph_objects as go
+    except ImportError:
+        return None
+    return go
+
+
+@functools.lru_cache(maxsize=1)
+def _plotly_cdn_tag() -> str:
+    """Script tag loading the plotly.js build that matches the installed Plotly"""
+    from plotly.offline import get_plotlyjs_version
+    return (f'<script charset="utf-8" '
+            f'src="https://cdn.plot.ly/plotly-{get_plotlyjs_version()}.min.js"></script>')
+
+
+@functools.lru_cache(maxsize=1)
+def _matplotlib():
+    """(Figure, FigureCanvasAgg, matplotlib.dates), or None if Matplotlib is not installed"""
+    try:
+        import matplotlib.dates as mdates
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.figure import Figure
+    except ImportError:
+        return None
+    return Figure, FigureCanvasAgg, mdates
+
+
+# (historical_data key, chart label) for each multi-timeframe chart
+_TIMEFRAMES = (('1y', '1 Year'), ('1m', '1 Month'), ('10d', '10 Days'))
+
+# Renders the timeframes of a chart request side by side
+_RENDER_POOL = ThreadPoolExecutor(max_workers=3)
+_JPEG_OPTIONS = {'quality': 85, 'optimize': False}
+
+# Plotly trace styles, built once (Plotly copies them into each figure)
+_HIST_LINE = {'color': '#667eea', 'width': 2}
+_FORECAST_LINE = {'color': '#10b981', 'width': 2, 'dash': 'dash'}
+_FORECAST_MARKER = {'size': 6}
+# Longer forecasts draw at most this many markers; every point still hovers
+_MAX_FORECAST_MARKERS = 30
+_CI_FILL = 'rgba(16, 185, 129, 0.2)'
+_CI_EDGE = {'color': 'rgba(255,255,255,0)'}
+_FORECAST_START_LINE = {'color': 'gray', 'width': 1, 'dash': 'dash'}
+# Everything in the forecast chart layout except its title
+_BASE_LAYOUT = {
+    'xaxis_title': 'Date',
+    'yaxis_title': 'Price ($)',
+    'template': 'plotly_white',
+    'hovermode': 'x unified',
+    'legend': {'yanchor': 'top', 'y': 0.99, 'xanchor': 'left', 'x': 0.01},
+    'margin': {'l': 60, 'r': 30, 't': 60, 'b': 60},
+}
+
+# What fig.to_html(include_plotlyjs='cdn') produces, minus its templating
+# overhead: the CDN tag, the target div and a newPlot call on the figure JSON
+_PLOTLY_HTML = (
+    '<div style="height:100%; width:100%;">{cdn}'
+    '<div id="{id}" class="plotly-graph-div" style="height:100%; width:100%;"></div>'
+    '<script>(function () {{ var fig = {figure}; '
+    'Plotly.newPlot("{id}", fig.data, fig.layout, {{"responsive": true}}); }})();</script>'
+    '</div>'
+)
+
+# Forecast summary card, filled by format_map from the forecast summary
+_SUMMARY_TEMPLATE = """
+        <div class="forecast-summary">
+            <h3>📈 Price Forecast for {symbol}</h3>
+            <div class="forecast-metrics">
+                <div class="metric-box">
+                    <span class="metric-label">Current Price</span>
+                    <span class="metric-value">${current_price:.2f}</span>
+                </div>
+                <div class="metric-box">
+                    <span class="metric-label">Next Day Prediction</span>
+                    <span class="metric-value">${next_day_prediction:.2f}</span>
+                    <span class="metric-range">{next_day_range}</span>
+                    <span class="metric-return">{next_day_expected_return}</span>
+                </div>
+                <div class="metric-box">
+                    <span class="metric-label">10-Day Prediction</span>
+                    <span class="metric-value">${day_10_prediction:.2f}</span>
+                    <span class="metric-range">{day_10_range}</span>
+                    <span class="metric-return">{day_10_expected_return}</span>
+                </div>
+            </div>
+            <div class="models-info">
+                <strong>Models:</strong> {models} |
+                <strong>Confidence:</strong> {confidence}
+            </div>
+        </div>
+        """
+_SUMMARY_DEFAULTS = {
+    'next_day_prediction': 0,
+    'next_day_range': 'N/A',
+    'next_day_expected_return': 'N/A',
+    'day_10_prediction': 0,
+    'day_10_range': 'N/A',
+    'day_10_expected_return': 'N/A',
+    'confidence': 'N/A',
+}
+
+# Rendered charts by (renderer, symbol, timeframe, input digest), shared by
+# every visualizer in the process and trimmed to the most recently used
+_PLOT_CACHE_SIZE = 64
+_PLOT_CACHE: "OrderedDict[tuple, str]" = OrderedDict()
+_PLOT_CACHE_LOCK = threading.Lock()
+
+
+def _digest(*series) -> str:
+    """Content hash of the chart inputs (numbers by value, dates as text)"""
+    h = hashlib.blake2b(digest_size=16)
+    for values in series:
+        if len(values) and not isinstance(values[0], (int, float, np.number)):
+            data = "\x00".join(map(str, values)).encode()
+        else:
+            data = np.ascontiguousarray(values, dtype=np.float64).tobytes()
+        h.update(len(data).to_bytes(8, 'little'))
+        h.update(data)
+    return h.hexdigest()
+
+
+def _call(fn, *args, **kwargs):
+    """Run fn inline; stands in for executor.submit when threads don't pay off"""
+    return fn(*args, **kwargs)
+
+
+def _write_bytes(path: str, data: bytes):
+    with open(path, 'wb') as f:
+        f.write(data)
+
+
+def _plot_cache_get(key: tuple) -> Optional[str]:
+    with _PLOT_CACHE_LOCK:
+        chart = _PLOT_CACHE.get(key)
+        if chart is not None:
+            _PLOT_CACHE.move_to_end(key)
+        return chart
+
+
+def _plot_cache_put(key: tuple, chart: str):
+    with _PLOT_CACHE_LOCK:
+        _PLOT_CACHE[key] = chart
+        _PLOT_CACHE.move_to_end(key)
+        while len(_PLOT_CACHE) > _PLOT_CACHE_SIZE:
+            _PLOT_CACHE.popitem(last=False)
+
+
+def _as_dates(dates) -> np.ndarray:
+    """Parse 'YYYY-MM-DD' strings in one vectorized call (other date types pass through)"""
+    if len(dates) and isinstance(dates[0], str):
+        return np.array(dates, dtype='datetime64[D]')
+    return np.asarray(dates)
 
 
 class StockVisualizer:
     """
     Creates visualizations for stock data and forecasts.
     Supports both Plotly (interactive) and Matplotlib (static) outputs.
+
+    One instance may be used from several threads at once (the orchestrator
+    renders different symbols' charts concurrently). Static charts are drawn
+    on a per-thread Figure through the Agg canvas, never through pyplot, so
+    no lock is needed around drawing; the chart cache and the list of
+    pending image writes each have their own lock.
     """
 
     def __init__(self, output_dir: str = "docs/charts"):
         self.output_dir = output_dir
         os.makedirs(output_dir, exist_ok=True)
+        # Matplotlib figure and axes reused for every static chart drawn by
+        # the same thread (created on first use)
+        self._local = threading.local()
+        # Encoded PNGs are written to disk in the background while the next
+        # chart renders; flush() waits for them
+        self._io_pool = ThreadPoolExecutor(max_workers=2)
+        self._pending: List[Future] = []
+        self._pending_lock = threading.Lock()
+
+    def _figure(self):
+        """This thread's figure, axes and date formatter, drawn through the Agg
+        canvas directly. Unlike pyplot this keeps no global state, so threads
+        never share a figure"""
+        if getattr(self._local, 'fig', None) is None:
+            Figure, FigureCanvasAgg, mdates = _matplotlib()
+            # Constrained layout fits the labels while drawing, so savefig
+            # needs neither tight_layout() nor a bbox_inches='tight' pre-pass
+            fig = Figure(figsize=(12, 6), layout='constrained')
+            FigureCanvasAgg(fig)
+            self._local.fig, self._local.ax = fig, fig.add_subplot()
+            # Built once; ax.cla() drops the axis formatter, so it is
+            # re-attached on every chart but never re-created
+            self._local.date_fmt = mdates.DateFormatter('%Y-%m-%d')
+        return self._local.fig, self._local.ax, self._local.date_fmt
+
+    def flush(self):
+        """Wait until every chart image handed out so far is on disk"""
+        with self._pending_lock:
+            pending, self._pending = self._pending, []
+        for future in pending:
+            future.result()
 
     def create_forecast_plot_plotly(
         self,
@@ -45,55 +231,71 @@ class StockVisualizer:
         forecast_dates: List[str],
         lower_bound: List[float],
         upper_bound: List[float],
-        timeframe: str = "1y"
+        timeframe: str = "1y",
+        include_plotlyjs: Union[bool, str] = False
     ) -> str:
         """
         Create an interactive Plotly forecast chart.
 
+        The fragment expects plotly.js to be loaded once by the page; pass
+        include_plotlyjs='cdn' (or True) for a standalone chart that loads it.
+
         Returns:
             HTML string containing the interactive chart
         """
-        if not PLOTLY_AVAILABLE:
+        go = _plotly()
+        if go is None:
             return "<p>Plotly not available for interactive charts</p>"
 
         fig = go.Figure()
 
         # Convert dates
-        hist_dates = [datetime.strptime(d, '%Y-%m-%d') if isinstance(d, str) else d for d in historical_dates]
-        fc_dates = [datetime.strptime(d, '%Y-%m-%d') if isinstance(d, str) else d for d in forecast_dates]
+        hist_dates = _as_dates(historical_dates)
+        fc_dates = _as_dates(forecast_dates)
+
+        # Numeric series as float64 arrays: Plotly embeds numpy arrays as
+        # base64 typed arrays instead of one JSON number per point (float64
+        # keeps the hover values exact)
+        hist_prices = np.asarray(historical_prices, dtype=np.float64)
+        fc_values = np.asarray(forecast_values, dtype=np.float64)
+        band = np.concatenate([np.asarray(upper_bound, dtype=np.float64),
+                               np.asarray(lower_bound, dtype=np.float64)[::-1]])
 
         # Historical prices
         fig.add_trace(go.Scatter(
             x=hist_dates,
-            y=historical_prices,
+            y=hist_prices,
             mode='lines',
             name='Historical',
-            line=dict(color='#667eea', width=2)
+            line=_HIST_LINE
         ))
 
         # Forecast
+        marker = _FORECAST_MARKER
+        if len(fc_values) > _MAX_FORECAST_MARKERS:
+            marker = {**marker, 'maxdisplayed': _MAX_FORECAST_MARKERS}
         fig.add_trace(go.Scatter(
             x=fc_dates,
-            y=forecast_values,
+            y=fc_values,
             mode='lines+markers',
             name='Forecast',
-            line=dict(color='#10b981', width=2, dash='dash'),
-            marker=dict(size=6)
+            line=_FORECAST_LINE,
+            marker=marker
         ))
 
         # Confidence interval
         fig.add_trace(go.Scatter(
-            x=fc_dates + fc_dates[::-1],
-            y=upper_bound + lower_bound[::-1],
+            x=np.concatenate([fc_dates, fc_dates[::-1]]),
+            y=band,
             fill='toself',
-            fillcolor='rgba(16, 185, 129, 0.2)',
-            line=dict(color='rgba(255,255,255,0)'),
+            fillcolor=_CI_FILL,
+            line=_CI_EDGE,
             name='95% Confidence Interval',
             showlegend=True
         ))
 
         # Add vertical line at forecast start (without annotation to avoid datetime issue)
-        if hist_dates:
+        if len(hist_dates):
             fig.add_shape(
                 type="line",
                 x0=hist_dates[-1],
@@ -101,25 +303,18 @@ class StockVisualizer:
                 y0=0,
                 y1=1,
                 yref="paper",
-                line=dict(color="gray", width=1, dash="dash")
+                line=_FORECAST_START_LINE
             )
 
-        fig.update_layout(
-            title=f'{symbol} Price Forecast ({timeframe} history)',
-            xaxis_title='Date',
-            yaxis_title='Price ($)',
-            template='plotly_white',
-            hovermode='x unified',
-            legend=dict(
-                yanchor="top",
-                y=0.99,
-                xanchor="left",
-                x=0.01
-            ),
-            margin=dict(l=60, r=30, t=60, b=60)
-        )
+        fig.update_layout(title=f'{symbol} Price Forecast ({timeframe} history)', **_BASE_LAYOUT)
 
-        return fig.to_html(full_html=False, include_plotlyjs='cdn')
+        # The figure was built here from known-good values, so skip Plotly's
+        # re-validation and HTML templating and emit its JSON directly
+        return _PLOTLY_HTML.format(
+            cdn=_plotly_cdn_tag() if include_plotlyjs else '',
+            id=f"plot-{secrets.token_hex(8)}",
+            figure=fig.to_json(validate=False)
+        )
 
     def create_forecast_plot_matplotlib(
         self,
@@ -131,34 +326,46 @@ class StockVisualizer:
         lower_bound: List[float],
         upper_bound: List[float],
         timeframe: str = "1y",
-        save_path: Optional[str] = None
+        save_path: Optional[str] = None,
+        image_format: str = "png",
+        dpi: int = 150
     ) -> Optional[str]:
         """
         Create a static Matplotlib forecast chart.
 
+        Saves a lossless PNG by default; pass image_format="jpeg" (and a
+        lower dpi) when encoding speed matters more than sharpness.
+        The file is written in the background; call flush() before reading it.
+
         Returns:
             Path to saved image or None
         """
-        if not MATPLOTLIB_AVAILABLE:
+        if _matplotlib() is None:
             return None
 
-        fig, ax = plt.subplots(figsize=(12, 6))
+        # Clear and redraw one figure instead of building a new figure,
+        # axes and tick machinery for every chart
+        fig, ax, date_fmt = self._figure()
+        ax.cla()
 
         # Convert dates
-        hist_dates = [datetime.strptime(d, '%Y-%m-%d') if isinstance(d, str) else d for d in historical_dates]
-        fc_dates = [datetime.strptime(d, '%Y-%m-%d') if isinstance(d, str) else d for d in forecast_dates]
+        hist_dates = _as_dates(historical_dates)
+        fc_dates = _as_dates(forecast_dates)
 
         # Plot historical
         ax.plot(hist_dates, historical_prices, color='#667eea', linewidth=2, label='Historical')
 
         # Plot forecast
-        ax.plot(fc_dates, forecast_values, color='#10b981', linewidth=2, linestyle='--', marker='o', markersize=4, label='Forecast')
+        markevery = None
+        if len(forecast_values) > _MAX_FORECAST_MARKERS:
+            markevery = -(-len(forecast_values) // _MAX_FORECAST_MARKERS)
+        ax.plot(fc_dates, forecast_values, color='#10b981', linewidth=2, linestyle='--', marker='o', markersize=4, markevery=markevery, label='Forecast')
 
         # Confidence interval
         ax.fill_between(fc_dates, lower_bound, upper_bound, color='#10b981', alpha=0.2, label='95% CI')
 
         # Vertical line at forecast start
-        if hist_dates:
+        if len(hist_dates):
             ax.axvline(x=hist_dates[-1], color='gray', linestyle='--', alpha=0.7)
 
         ax.set_title(f'{symbol} Price Forecast ({timeframe} history)', fontsize=14, fontweight='bold')
@@ -168,20 +375,22 @@ class StockVisualizer:
         ax.grid(True, alpha=0.3)
 
         # Format x-axis dates
-        ax.xaxis.set_major_formatter(mdates.DateFormatter('%Y-%m-%d'))
-        plt.xticks(rotation=45)
-        plt.tight_layout()
-
-        if save_path:
-            plt.savefig(save_path, dpi=150, bbox_inches='tight')
-            plt.close()
-            return save_path
-        else:
-            # Save to default location
-            filename = f"{self.output_dir}/{symbol.lower()}_forecast_{timeframe}.png"
-            plt.savefig(filename, dpi=150, bbox_inches='tight')
-            plt.close()
-            return filename
+        ax.xaxis.set_major_formatter(date_fmt)
+        for label in ax.get_xticklabels():
+            label.set_rotation(45)
+
+        # Encode now; the file write can wait
+        buf = io.BytesIO()
+        options = {'pil_kwargs': _JPEG_OPTIONS} if image_format in ('jpeg', 'jpg') else {}
+        fig.savefig(buf, format=image_format, dpi=dpi, **options)
+
+        # Save to the given path or the default location
+        extension = 'jpg' if image_format == 'jpeg' else image_format
+        filename = save_path or f"{self.output_dir}/{symbol.lower()}_forecast_{timeframe}.{extension}"
+        future = self._io_pool.submit(_write_bytes, filename, buf.getvalue())
+        with self._pending_lock:
+            self._pending.append(future)
+        return filename
 
     def create_multi_timeframe_chart(
         self,
@@ -192,7 +401,9 @@ class StockVisualizer:
         Create charts for multiple timeframes (1y, 1m, 10d).
 
         Returns:
-            Dictionary mapping timeframe to chart HTML/path
+            Dictionary mapping timeframe to chart HTML/path. Plotly charts
+            share one loader tag, returned under 'plotlyjs', for the caller
+            to place once on the page
         """
         charts = {}
 
@@ -205,17 +416,38 @@ class StockVisualizer:
         lower_bound = ensemble.get('lower_bound', [])
         upper_bound = ensemble.get('upper_bound', [])
         forecast_dates = forecast_data.get('future_dates', [])
+        if not (forecast_values and forecast_dates):
+            return {"error": "empty forecast"}
 
         historical_data = forecast_data.get('historical_data', {})
 
-        for timeframe, label in [('1y', '1 Year'), ('1m', '1 Month'), ('10d', '10 Days')]:
-            hist = historical_data.get(timeframe, {})
-            prices = hist.get('prices', [])
-            dates = hist.get('dates', [])
+        if _plotly() is not None:
+            renderer, saves_file, options = self.create_forecast_plot_plotly, False, {}
+        elif _matplotlib() is not None:
+            renderer, saves_file, options = self.create_forecast_plot_matplotlib, True, {}
+        else:
+            return charts
+        submit = _RENDER_POOL.submit if saves_file else _call
+
+        # The timeframes are independent, so uncached static images render
+        # in parallel: Agg rasterization and image encoding run in C, and
+        # each thread draws on its own figure. Plotly output is built by
+        # pure-Python JSON serialization and gains nothing from threads.
+        pending = []
+        for timeframe, label in _TIMEFRAMES:
+            hist = historical_data.get(timeframe)
+            prices, dates = (hist.get('prices'), hist.get('dates')) if hist else (None, None)
 
             if prices and dates:
-                if PLOTLY_AVAILABLE:
-                    charts[timeframe] = self.create_forecast_plot_plotly(
+                # Identical inputs give an identical chart, so reuse it (a
+                # saved image only while its file is still there)
+                key = (renderer.__name__, self.output_dir, symbol, label,
+                       _digest(prices, dates, forecast_values, forecast_dates,
+                               lower_bound, upper_bound))
+                chart = _plot_cache_get(key)
+                if chart is None or (saves_file and not os.path.exists(chart)):
+                    chart = submit(
+                        renderer,
                         symbol=symbol,
                         historical_prices=prices,
                         historical_dates=dates,
@@ -223,20 +455,23 @@ class StockVisualizer:
                         forecast_dates=forecast_dates,
                         lower_bound=lower_bound,
                         upper_bound=upper_bound,
-                        timeframe=label
-                    )
-                elif MATPLOTLIB_AVAILABLE:
-                    charts[timeframe] = self.create_forecast_plot_matplotlib(
-                        symbol=symbol,
-                        historical_prices=prices,
-                        historical_dates=dates,
-                        forecast_values=forecast_values,
-                        forecast_dates=forecast_dates,
-                        lower_bound=lower_bound,
-                        upper_bound=upper_bound,
-                        timeframe=label
+                        timeframe=label,
+                        **options
                     )
+                pending.append((timeframe, key, chart))
+
+        for timeframe, key, chart in pending:
+            if isinstance(chart, Future):
+                chart = chart.result()
+            if chart is not None:
+                _plot_cache_put(key, chart)
+            charts[timeframe] = chart
 
+        if charts and not saves_file:
+            charts['plotlyjs'] = _plotly_cdn_tag()
+
+        # Returned image paths must be readable by the caller
+        self.flush()
         return charts
 
     def generate_forecast_summary_html(self, forecast_data: Dict) -> str:
@@ -244,37 +479,16 @@ class StockVisualizer:
         Generate HTML summary of forecast results.
         """
         summary = forecast_data.get('summary', {})
-        symbol = forecast_data.get('symbol', 'Unknown')
-        current_price = forecast_data.get('current_price', 0)
-
-        html = f"""
-        <div class="forecast-summary">
-            <h3>📈 Price Forecast for {symbol}</h3>
-            <div class="forecast-metrics">
-                <div class="metric-box">
-                    <span class="metric-label">Current Price</span>
-                    <span class="metric-value">${current_price:.2f}</span>
-                </div>
-                <div class="metric-box">
-                    <span class="metric-label">Next Day Prediction</span>
-                    <span class="metric-value">${summary.get('next_day_prediction', 0):.2f}</span>
-                    <span class="metric-range">{summary.get('next_day_range', 'N/A')}</span>
-                    <span class="metric-return">{summary.get('next_day_expected_return', 'N/A')}</span>
-                </div>
-                <div class="metric-box">
-                    <span class="metric-label">10-Day Prediction</span>
-                    <span class="metric-value">${summary.get('day_10_prediction', 0):.2f}</span>
-                    <span class="metric-range">{summary.get('day_10_range', 'N/A')}</span>
-                    <span class="metric-return">{summary.get('day_10_expected_return', 'N/A')}</span>
-                </div>
-            </div>
-            <div class="models-info">
-                <strong>Models:</strong> {', '.join(summary.get('models_used', ['N/A']))} |
-                <strong>Confidence:</strong> {summary.get('confidence', 'N/A')}
-            </div>
-        </div>
-        """
-        return html
+        context = ChainMap(
+            {
+                'symbol': forecast_data.get('symbol', 'Unknown'),
+                'current_price': forecast_data.get('current_price', 0),
+                'models': ', '.join(summary.get('models_used', ['N/A'])),
+            },
+            summary,
+            _SUMMARY_DEFAULTS
+        )
+        return _SUMMARY_TEMPLATE.format_map(context)
 
 
 if __name__ == "__main__":
@@ -282,19 +496,21 @@ if __name__ == "__main__":
     print("Testing Stock Visualizer...")
 
     # Create sample data
-    import random
+    rng = np.random.default_rng()
+    today = np.datetime64('today', 'D')
     base_price = 100
-    prices = [base_price + random.uniform(-5, 5) + i * 0.1 for i in range(365)]
-    dates = [(datetime.now() - timedelta(days=365-i)).strftime('%Y-%m-%d') for i in range(365)]
+    prices = (base_price + rng.uniform(-5, 5, 365) + np.arange(365) * 0.1).tolist()
+    dates = (today - np.arange(365, 0, -1)).astype(str).tolist()
 
-    forecast_values = [prices[-1] + i * 0.5 for i in range(10)]
-    forecast_dates = [(datetime.now() + timedelta(days=i+1)).strftime('%Y-%m-%d') for i in range(10)]
-    lower_bound = [v - 5 for v in forecast_values]
-    upper_bound = [v + 5 for v in forecast_values]
+    forecast = prices[-1] + np.arange(10) * 0.5
+    forecast_values = forecast.tolist()
+    forecast_dates = (today + np.arange(1, 11)).astype(str).tolist()
+    lower_bound = (forecast - 5).tolist()
+    upper_bound = (forecast + 5).tolist()
 
     visualizer = StockVisualizer()
 
-    if PLOTLY_AVAILABLE:
+    if _plotly() is not None:
         html = visualizer.create_forecast_plot_plotly(
             symbol="TEST",
             historical_prices=prices,
@@ -306,7 +522,7 @@ if __name__ == "__main__":
         )
         print(f"Plotly chart generated: {len(html)} characters")
 
-    if MATPLOTLIB_AVAILABLE:
+    if _matplotlib() is not None:
         path = visualizer.create_forecast_plot_matplotlib(
             symbol="TEST",
             historical_prices=prices[-30:],
@@ -317,4 +533,5 @@ if __name__ == "__main__":
             upper_bound=upper_bound,
             timeframe="1m"
         )
+        visualizer.flush()
         print(f"Matplotlib chart saved to: {path}")